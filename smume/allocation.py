@@ -0,0 +1,308 @@
+# allocation.py
+
+from collections import deque
+
+from smume.electives import hopcroft_karp
+
+MS_CATEGORY = "MS"  # Category whose share of a course is capped by Course.ms_credits
+
+
+class _FlowNetwork:
+    """
+    Small max-flow network (Dinic). Nodes are integers; add_edge returns the
+    edge index, whose flow is available as flow(e) after max_flow.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.adjacency = [[] for _ in range(n)]
+        self.to = []
+        self.capacity = []  # Residual capacities; edge e ^ 1 is the reverse of e
+
+    def add_edge(self, u, v, capacity):
+        e = len(self.to)
+        self.to += [v, u]
+        self.capacity += [capacity, 0]
+        self.adjacency[u].append(e)
+        self.adjacency[v].append(e + 1)
+        return e
+
+    def flow(self, e):
+        return self.capacity[e ^ 1]
+
+    def _levels(self, source):
+        level = [-1] * self.n
+        level[source] = 0
+        queue = deque([source])
+        while queue:
+            u = queue.popleft()
+            for e in self.adjacency[u]:
+                v = self.to[e]
+                if self.capacity[e] > 0 and level[v] == -1:
+                    level[v] = level[u] + 1
+                    queue.append(v)
+        return level
+
+    def max_flow(self, source, sink):
+        total = 0
+        while True:
+            level = self._levels(source)
+            if level[sink] == -1:
+                return total
+            position = [0] * self.n
+            while True:
+                pushed = self._augment(source, sink, level, position)
+                if not pushed:
+                    break
+                total += pushed
+
+    def _augment(self, source, sink, level, position):
+        # One blocking-flow path by iterative DFS over the level graph
+        path = []
+        u = source
+        while True:
+            if u == sink:
+                pushed = min(self.capacity[e] for e in path)
+                for e in path:
+                    self.capacity[e] -= pushed
+                    self.capacity[e ^ 1] += pushed
+                return pushed
+            edges = self.adjacency[u]
+            while position[u] < len(edges):
+                e = edges[position[u]]
+                v = self.to[e]
+                if self.capacity[e] > 0 and level[v] == level[u] + 1:
+                    break
+                position[u] += 1
+            else:
+                if not path:
+                    return 0
+                level[u] = -1  # Dead end for this phase
+                e = path.pop()
+                u = self.to[e ^ 1]
+                position[u] += 1
+                continue
+            path.append(e)
+            u = self.to[e]
+
+    def reachable(self, source):
+        """
+        Returns the nodes reachable from source in the residual network (the source side of a minimum cut).
+        """
+        return self._levels(source)
+
+
+def category_hierarchy(curriculum):
+    """
+    Returns a dictionary mapping each category to its top-level category: the
+    root of its chain of "parent" categories as declared in the categories
+    definition (e.g., "F" and "Con" in "C"), else the category itself.
+    Raises ValueError if the parents form a cycle.
+    """
+    parents = curriculum.category_parents
+    top = {}
+    for cat in curriculum.categories:
+        root, seen = cat, {cat}
+        while root in parents:
+            root = parents[root]
+            if root in seen:
+                raise ValueError(f"The parent categories of {cat} form a cycle.")
+            seen.add(root)
+        top[cat] = root
+    return top
+
+
+def _top_categories(course, top, order):
+    tops = {top.get(cat, cat) for cat in course.categories}
+    return sorted(tops, key=lambda cat: order.get(cat, len(order)))
+
+
+def credit_shares(course, top, order):
+    """
+    Splits a course's credits between its top-level categories without double
+    counting: the MS share is the course's ms_credits and the rest goes to its
+    first other top-level category (in category order).
+    Returns a dictionary of category -> credits.
+    """
+    tops = _top_categories(course, top, order)
+    shares = {}
+    remaining = course.credits
+    if MS_CATEGORY in tops:
+        shares[MS_CATEGORY] = min(course.ms_credits, remaining)
+        remaining -= shares[MS_CATEGORY]
+    others = [cat for cat in tops if cat != MS_CATEGORY]
+    if others:
+        shares[others[0]] = shares.get(others[0], 0) + remaining
+    elif tops:
+        shares[tops[0]] = shares.get(tops[0], 0) + remaining
+    return shares
+
+
+def credit_demands(curriculum):
+    """
+    Returns the credits required in each top-level category: the largest explicit
+    "Number of Credits" requirement, else the category's credit shares (see
+    credit_shares) summed over the curriculum courses, so that a course in two
+    categories is not required in full by both. Categories that need no credits
+    are left out. Cached per curriculum version, category hierarchy and requirement set.
+    """
+    top = category_hierarchy(curriculum)
+    signature = tuple(top.items()) + tuple(
+        (cat, req.get("kind"), req.get("number"))
+        for cat, reqs in curriculum.explicit_category_requirements.items() for req in reqs
+    )
+    cache = curriculum.graph.cache
+    cached = cache.get("credit_demands")
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    order = {cat: k for k, cat in enumerate(curriculum.categories)}
+    implicit = {}
+    for course in curriculum.courses.values():
+        for cat, credits in credit_shares(course, top, order).items():
+            implicit[cat] = implicit.get(cat, 0) + credits
+    demands = {}
+    for cat in curriculum.categories:
+        if top.get(cat, cat) != cat:
+            continue
+        explicit = [
+            req["number"] for req in curriculum.explicit_category_requirements.get(cat, [])
+            if req.get("kind") == "Number of Credits" and req.get("number") is not None
+        ]
+        number = max(explicit) if explicit else implicit.get(cat, 0)
+        if number:
+            demands[cat] = number
+    cache["credit_demands"] = (signature, demands)
+    return demands
+
+
+class CreditAllocation:
+    """
+    Result of allocate_credits:
+        allocation:  course name -> {top-level category: credits}; every course
+                     gives at most its credits in total (and at most ms_credits to MS)
+        allocated:   top-level category -> credits allocated to it
+        demands:     top-level category -> credits required (see credit_demands)
+        shortfall:   top-level category -> credits missing
+        writing_intensive: (category, slot number) -> course counted for that
+                     writing intensive requirement (None if unfilled)
+        blocking:    when some demand is unmet, the certificate that no allocation
+                     can do better: the categories on the sink side of a minimum
+                     cut, their total demand and the most credits any allocation
+                     can give them (the cut capacity); None when every demand is met
+    """
+
+    def __init__(self, allocation, allocated, demands, writing_intensive, blocking):
+        self.allocation = allocation
+        self.allocated = allocated
+        self.demands = demands
+        self.shortfall = {cat: demands[cat] - allocated.get(cat, 0) for cat in demands if allocated.get(cat, 0) < demands[cat]}
+        self.writing_intensive = writing_intensive
+        self.blocking = blocking
+
+    @property
+    def ok(self):
+        return not self.shortfall and all(course is not None for course in self.writing_intensive.values())
+
+    def verify(self, plan):
+        """
+        Checks the allocation against the plan's courses: no course gives more
+        than its credits (or ms_credits to MS), only to categories it belongs to,
+        and the category totals add up. Returns a list of problems (empty if none).
+        """
+        problems = []
+        top = category_hierarchy(plan.curriculum)
+        totals = {}
+        for name, shares in self.allocation.items():
+            course = plan.get_course(name)
+            allowed = {top.get(cat, cat) for cat in course.categories}
+            if sum(shares.values()) > course.credits:
+                problems.append(f"{name} gives {sum(shares.values())} credits but has {course.credits}.")
+            for cat, credits in shares.items():
+                if cat not in allowed:
+                    problems.append(f"{name} is not in category {cat}.")
+                if cat == MS_CATEGORY and credits > course.ms_credits:
+                    problems.append(f"{name} gives {credits} credits to {MS_CATEGORY} but has {course.ms_credits} MS credits.")
+                totals[cat] = totals.get(cat, 0) + credits
+        for cat, credits in self.allocated.items():
+            if totals.get(cat, 0) != credits:
+                problems.append(f"Category {cat} totals {totals.get(cat, 0)} credits, not {credits}.")
+        return problems
+
+
+def _writing_intensive_slots(curriculum):
+    slots = []
+    for cat, reqs in curriculum.explicit_category_requirements.items():
+        for req in reqs:
+            if req.get("kind") == "Writing Intensive":
+                slots += [(cat, k) for k in range(req.get("number") or 1)]
+    return slots
+
+
+def allocate_credits(plan, completed_only=False):
+    """
+    Allocates the credits of a plan's courses (or only its completed courses)
+    to the top-level category credit requirements, so that no credit counts
+    twice, as a maximum flow:
+        source -> course (its credits) -> top-level category (credits, or
+        ms_credits for MS) -> sink (the category's demand).
+    Writing intensive requirements are matched first (each writing intensive
+    course counts for at most one requirement), and a matched course can only
+    give credits to the top-level category of its requirement.
+    Returns a CreditAllocation.
+    """
+    curriculum = plan.curriculum
+    top = category_hierarchy(curriculum)
+    order = {cat: k for k, cat in enumerate(curriculum.categories)}
+    demands = credit_demands(curriculum)
+    courses = [c for c in plan.courses if c.completed or not completed_only]
+
+    # Writing intensive requirements: match slots to courses
+    slots = _writing_intensive_slots(curriculum)
+    wi_courses = [c for c in courses if c.writing_intensive]
+    adjacency = [[k for k, c in enumerate(wi_courses) if cat in c.categories] for cat, _ in slots]
+    match = hopcroft_karp(adjacency, len(wi_courses))
+    writing_intensive = {slot: wi_courses[v].name if v != -1 else None for slot, v in zip(slots, match)}
+    pinned = {wi_courses[v].name: top.get(slot[0], slot[0]) for slot, v in zip(slots, match) if v != -1}
+
+    categories = list(demands)
+    category_node = {cat: len(courses) + 1 + k for k, cat in enumerate(categories)}
+    source, sink = 0, len(courses) + len(categories) + 1
+    network = _FlowNetwork(sink + 1)
+    course_edges = []
+    for k, course in enumerate(courses):
+        node = k + 1
+        network.add_edge(source, node, course.credits)
+        tops = _top_categories(course, top, order)
+        if course.name in pinned:
+            tops = [pinned[course.name]]
+        edges = {}
+        for cat in tops:
+            if cat in category_node:
+                capacity = course.ms_credits if cat == MS_CATEGORY else course.credits
+                edges[cat] = network.add_edge(node, category_node[cat], capacity)
+        course_edges.append(edges)
+    for cat in categories:
+        network.add_edge(category_node[cat], sink, demands[cat])
+    network.max_flow(source, sink)
+
+    allocation = {}
+    allocated = {cat: 0 for cat in categories}
+    for course, edges in zip(courses, course_edges):
+        shares = {cat: network.flow(e) for cat, e in edges.items() if network.flow(e)}
+        if shares:
+            allocation[course.name] = shares
+            for cat, credits in shares.items():
+                allocated[cat] += credits
+
+    blocking = None
+    if any(allocated[cat] < demands[cat] for cat in categories):
+        level = network.reachable(source)
+        blocked = [cat for cat in categories if level[category_node[cat]] == -1]
+        blocked_set = set(blocked)
+        # Every credit these categories can get: the exhausted courses plus the saturated course -> category edges
+        capacity = sum(
+            network.flow(e) for edges in course_edges for cat, e in edges.items() if cat in blocked_set
+        )
+        blocking = {"categories": blocked, "demand": sum(demands[cat] for cat in blocked), "capacity": capacity}
+
+    return CreditAllocation(allocation, allocated, demands, writing_intensive, blocking)
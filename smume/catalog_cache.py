@@ -0,0 +1,144 @@
+# catalog_cache.py
+
+import hashlib
+import importlib
+import importlib.util
+import os
+import pickle
+import pkgutil
+import sys
+
+# Bump when the pickled layout of Curriculum/Course/GenericPlan changes incompatibly
+FORMAT_VERSION = 1
+
+# Modules whose classes end up in the pickle; their source is part of the cache key.
+# Results other modules keep in CourseGraph.cache are dropped when pickling.
+MODEL_MODULES = (
+    "smume.course_model", "smume.course_graph", "smume.curriculum",
+    "smume.generic_plan", "smume.plan_state", "smume.terms",
+)
+
+
+def cache_dir():
+    """
+    Returns the directory for compiled catalogs ($SMUME_CACHE_DIR), or None when
+    caching is off, the default. Cache files are unpickled when loaded, so the
+    directory must not be writable by anyone else.
+    """
+    return os.environ.get("SMUME_CACHE_DIR") or None
+
+
+def _source_bytes(module_name):
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or not spec.origin or not os.path.isfile(spec.origin):
+        raise ValueError(f"Cannot find the source of catalog module {module_name}.")
+    with open(spec.origin, "rb") as f:
+        return f.read()
+
+
+def source_hash(module_name, extra=b""):
+    """
+    Hash of a catalog module's source, the model modules' sources, the cache
+    format version and the Python version (plus any `extra` bytes, e.g., the
+    source of a legacy catalog file). Any change gives a new cache file.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{FORMAT_VERSION}:{sys.version_info[0]}.{sys.version_info[1]}".encode())
+    digest.update(extra)
+    for name in (module_name,) + MODEL_MODULES:
+        digest.update(name.encode())
+        digest.update(_source_bytes(name))
+    return digest.hexdigest()[:16]
+
+
+def cache_path(module_name):
+    directory = cache_dir()
+    if directory is None:
+        return None
+    return os.path.join(directory, f"{module_name.rsplit('.', 1)[-1]}-{source_hash(module_name)}.pickle")
+
+
+def write_cache(path, compiled):
+    """
+    Pickles a compiled (curriculum, generic_plan) pair to path (nothing is
+    written if path is None, i.e. caching is off).
+    Failing to write the cache (e.g., a read-only directory) is not an error.
+    """
+    if path is None:
+        return
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)  # Atomic, so concurrent workers never read a partial file
+    except (OSError, pickle.PicklingError, TypeError) as e:
+        print(f"Could not write catalog cache {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _run_catalog_module(module_name):
+    # A fresh module object that is not registered in sys.modules, so the catalog
+    # is freed once the caller drops the objects it built
+    spec = importlib.util.find_spec(module_name)
+    if spec is None:
+        raise ImportError(f"No catalog module {module_name}.")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def compile_catalog(module_name):
+    """
+    Runs a catalog module's definition code (without importing it into
+    sys.modules) and writes the built (curriculum, generic_plan) pair to the
+    cache, if caching is on. Returns the pair.
+    """
+    mod = _run_catalog_module(module_name)
+    compiled = (mod.curriculum, getattr(mod, "generic_plan", None))
+    write_cache(cache_path(module_name), compiled)
+    return compiled
+
+
+def load_catalog(module_name, use_imported=True):
+    """
+    Returns the (curriculum, generic_plan) pair of a catalog module such as
+    'smume.curricula._2024_25'. Uses, in order: the imported module (if it is
+    already imported and use_imported is True), the compiled cache file for the
+    current source (if caching is on, see cache_dir), or compiles the module and
+    caches it. The loaded objects are
+    not kept by this module; see registry.CatalogRegistry for in-process caching.
+    """
+    mod = sys.modules.get(module_name) if use_imported else None
+    if mod is not None:
+        return mod.curriculum, getattr(mod, "generic_plan", None)
+    path = cache_path(module_name)
+    if path is not None:
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            pass
+    return compile_catalog(module_name)
+
+
+def compile_all(package="smume.curricula"):
+    """
+    Compiles every catalog module in the package. Returns the cache file paths.
+    Raises ValueError if caching is off ($SMUME_CACHE_DIR is not set).
+    """
+    if cache_dir() is None:
+        raise ValueError("Catalog caching is off; set $SMUME_CACHE_DIR to the directory to compile into.")
+    pkg = importlib.import_module(package)
+    paths = []
+    for info in pkgutil.iter_modules(pkg.__path__):
+        module_name = f"{package}.{info.name}"
+        compile_catalog(module_name)
+        paths.append(cache_path(module_name))
+    return paths
+
+
+if __name__ == "__main__":
+    for path in compile_all():
+        print(f"Compiled {path}")
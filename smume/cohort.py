@@ -0,0 +1,136 @@
+# cohort.py
+
+import contextlib
+import io
+from concurrent.futures import ProcessPoolExecutor
+
+_base_plan = None  # Plan shared with the worker processes of evaluate_scenarios
+
+
+def apply_edits(plan, edits):
+    """
+    Applies a sequence of edits to a plan. Each edit is a tuple of a plan method
+    name and its arguments, optionally followed by a dictionary of keyword
+    arguments, e.g.:
+        ("set_course_term", "MTH 172", None, None, "2025-Su")
+        ("bump_course_term", "GE 204")
+        ("set_course_term", "MTH 172", {"term": "2025-Su"})
+    """
+    for edit in edits:
+        method_name, *args = edit
+        kwargs = args.pop() if args and isinstance(args[-1], dict) else {}
+        method = getattr(plan, method_name, None)
+        if method_name.startswith("_") or not callable(method):
+            raise ValueError(f"Invalid plan edit: {method_name}")
+        method(*args, **kwargs)
+    return plan
+
+
+def credits_by_term(plan):
+    """
+    Returns a dictionary of term -> planned credits, in term order.
+    """
+    loads = {}
+    for course in plan.courses:
+        loads[course.term] = loads.get(course.term, 0) + course.credits
+    return dict(sorted(loads.items()))
+
+
+def summarize_plan(plan):
+    """
+    Returns the graduation (last) term, the dependency violations and the
+    per-term credit loads of a plan.
+    """
+    return {
+        "graduation_term": plan.last_term(),
+        "violations": {name: dict(unmet) for name, unmet in plan.check_dependencies().items()},
+        "credits_by_term": credits_by_term(plan),
+    }
+
+
+def evaluate_scenario(plan, edits, enforce=True, quiet=True):
+    """
+    Applies edits to a fork of plan (optionally followed by enforce_dependencies,
+    as an advisor would) and summarizes the result. The plan itself is unchanged.
+    """
+    scenario = plan.fork()
+    output = io.StringIO() if quiet else None
+    with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+        apply_edits(scenario, edits)
+        if enforce and hasattr(scenario, "enforce_dependencies"):
+            scenario.enforce_dependencies()
+    return summarize_plan(scenario)
+
+
+def _init_worker(plan):
+    global _base_plan
+    _base_plan = plan
+
+
+def _evaluate_in_worker(edits, enforce, quiet):
+    return evaluate_scenario(_base_plan, edits, enforce, quiet)
+
+
+def evaluate_scenarios(plan, scenarios, enforce=True, max_workers=None, quiet=True):
+    """
+    Evaluates candidate edit sequences against a plan side by side, e.g.:
+        evaluate_scenarios(plan, {
+            "MTH 172 in summer": [("set_course_term", "MTH 172", {"term": "2025-Su"})],
+            "Delay GE 204": [("bump_course_term", "GE 204")],
+        })
+    scenarios is a dictionary of label -> edits (or a list of edits, labeled by
+    position); see apply_edits for the edit format. Every scenario runs on its own
+    fork of plan, and scenarios are spread over a process pool (the plan is sent
+    to each worker once). Use max_workers=1 to evaluate in this process.
+    Returns {"baseline": summary of the unchanged plan, "scenarios": {label ->
+    summary}} (see summarize_plan). A scenario that fails (e.g., an invalid edit)
+    gets {"error": message} instead and does not stop the others.
+    """
+    if not isinstance(scenarios, dict):
+        scenarios = {i: edits for i, edits in enumerate(scenarios)}
+    baseline = summarize_plan(plan)
+    results = {}
+    if max_workers == 1 or len(scenarios) <= 1:
+        for label, edits in scenarios.items():
+            try:
+                results[label] = evaluate_scenario(plan, edits, enforce, quiet)
+            except Exception as e:
+                results[label] = {"error": f"{type(e).__name__}: {e}"}
+        return {"baseline": baseline, "scenarios": results}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(plan,)) as pool:
+        futures = {
+            label: pool.submit(_evaluate_in_worker, edits, enforce, quiet)
+            for label, edits in scenarios.items()
+        }
+        for label, future in futures.items():
+            try:
+                results[label] = future.result()
+            except Exception as e:
+                results[label] = {"error": f"{type(e).__name__}: {e}"}
+    return {"baseline": baseline, "scenarios": results}
+
+
+def eligibility_matrix(plans, term=None, **kwargs):
+    """
+    Answers "which courses can each student take next" for a whole cohort.
+    plans is a list of StudentPlans (or a dictionary of label -> plan); keyword
+    arguments are passed to StudentPlan.eligible_courses. Returns (courses, rows):
+    courses lists every course eligible for at least one student (in order of
+    first appearance) and rows maps each student (student_id, else
+    student_name) to a list of booleans aligned with courses.
+    """
+    if not isinstance(plans, dict):
+        labeled = {}
+        for plan in plans:
+            label = plan.student_id or plan.student_name
+            if label in labeled:
+                label = f"{label} ({len(labeled)})"
+            labeled[label] = plan
+        plans = labeled
+    eligible = {label: plan.eligible_courses(term, **kwargs) for label, plan in plans.items()}
+    courses = list(dict.fromkeys(name for names in eligible.values() for name in names))
+    rows = {}
+    for label, names in eligible.items():
+        names = set(names)
+        rows[label] = [name in names for name in courses]
+    return courses, rows
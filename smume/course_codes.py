@@ -0,0 +1,131 @@
+# course_codes.py
+
+import re
+
+# One pass over a raw code: either a DTA marker anywhere in it (e.g. '0AA-DTA-SPR22')
+# or a plain code: letters, digits and at most one suffix letter (e.g. 'me345x', 'COR 210 W')
+CODE_PATTERN = re.compile(
+    r"(?P<dta>A[AS])-?DTA|^\s*(?P<prefix>[A-Z]+)[\s-]*(?P<number>\d+)\s*(?P<suffix>[A-Z]?)\s*$",
+    re.IGNORECASE,
+)
+KEPT_SUFFIXES = ("W", "L")  # Writing intensive and laboratory variants are distinct courses
+
+
+def _fallback_normalize(code):
+    # Codes CODE_PATTERN does not recognize, e.g. 'GE 2XX' or 'CSC 101AB'
+    code = re.sub(r'(\D+)(\d+)', r'\1 \2', code)  # Add space between letters and numbers
+    code = re.sub(r'\s+', ' ', code)  # Normalize multiple spaces
+    code = code.strip().upper()
+    # If it ends with a letter, and that letter isn't a W or L, strip it
+    if code and code[-1].isalpha() and code[-1] not in KEPT_SUFFIXES:
+        code = code[:-1]
+    return code
+
+
+class CourseCodeNormalizer:
+    """
+    Maps course codes as written by the registrar (e.g. 'cor100', 'ME  345X',
+    'CHM131', '0AA-DTA-SPR22') to canonical codes ('COR 100', 'ME 345',
+    'CHM 131', 'AA-DTA'). Codes are parsed with one precompiled pattern and the
+    result of every distinct raw code is memoized.
+    With a curriculum, an alias table maps further:
+        - cross-listed codes declared with Curriculum.cross_list,
+        - a writing intensive variant ('ME 201W') to its course when the
+          curriculum has no separate W course (W and L variants that are in the
+          curriculum, like 'COR 210W' and 'PHY 171L', are kept).
+    Without a curriculum it can be used on its own, e.g. for registrar exports.
+    """
+
+    def __init__(self, curriculum=None, aliases=None):
+        self._memo = {}
+        self.aliases = {}
+        if curriculum is not None:
+            names = set(curriculum.courses)
+            for name in names:
+                if name + "W" not in names and self._parse(name)[0] == name and not name.endswith(KEPT_SUFFIXES):
+                    self.aliases[name + "W"] = name
+            for alias, name in getattr(curriculum, "course_aliases", {}).items():
+                self.aliases[self._parse(alias)[0]] = name
+        for alias, name in (aliases or {}).items():
+            self.aliases[self._parse(alias)[0]] = name
+
+    @staticmethod
+    def _parse(raw):
+        match = CODE_PATTERN.search(raw)
+        if match is None:
+            return _fallback_normalize(raw), None
+        if match.group("dta"):
+            dta = f"{match.group('dta').upper()}-DTA"
+            return dta, dta
+        suffix = match.group("suffix").upper()
+        if suffix not in KEPT_SUFFIXES:
+            suffix = ""
+        return f"{match.group('prefix').upper()} {match.group('number')}{suffix}", None
+
+    def _resolve(self, raw):
+        resolved = self._memo.get(raw)
+        if resolved is None:
+            code, dta = self._parse(raw)
+            resolved = self._memo[raw] = (self.aliases.get(code, code), dta)
+        return resolved
+
+    def normalize(self, raw):
+        """
+        Returns the canonical code of a raw course code ('' for a blank code).
+        """
+        return self._resolve(raw)[0]
+
+    def dta(self, raw):
+        """
+        Returns the DTA ('AA-DTA' or 'AS-DTA') a raw code marks, else None.
+        """
+        return self._resolve(raw)[1]
+
+    def normalize_many(self, raws):
+        """
+        Returns the canonical codes of an iterable of raw codes, in order.
+        """
+        memo = self._memo
+        return [memo[raw][0] if raw in memo else self._resolve(raw)[0] for raw in raws]
+
+    def add_alias(self, alias, name):
+        """
+        Maps another code (e.g., a cross-listed code) to a canonical code.
+        """
+        self.aliases[self._parse(alias)[0]] = name
+        self._memo.clear()
+
+
+_default_normalizer = CourseCodeNormalizer()
+
+
+def normalize_course_code(raw):
+    """
+    Normalizes a course code without a curriculum, e.g. 'cor100' -> 'COR 100' and
+    'ME  345X' -> 'ME 345' (see CourseCodeNormalizer).
+    """
+    return _default_normalizer.normalize(raw)
+
+
+def course_code_normalizer(curriculum):
+    """
+    Returns the CourseCodeNormalizer of a curriculum, built once per curriculum version.
+    """
+    cache = curriculum.graph.cache
+    if "course_codes" not in cache:
+        cache["course_codes"] = CourseCodeNormalizer(curriculum)
+    return cache["course_codes"]
+
+
+if __name__ == "__main__":
+    # Normalizes the codes read from standard input, one per line:
+    #   python -m smume.course_codes [catalog] < codes.txt
+    import sys
+    if len(sys.argv) > 1:
+        from smume.registry import registry
+        normalizer = course_code_normalizer(registry.curriculum(sys.argv[1]))
+    else:
+        normalizer = _default_normalizer
+    for line in sys.stdin:
+        raw = line.rstrip("\n")
+        print(f"{raw}\t{normalizer.normalize(raw)}")
@@ -0,0 +1,235 @@
+# course_graph.py
+
+RELATIONS = ("prereq", "coreq", "coprereq")
+RELATION_ATTRIBUTES = {"prereq": "prereqs", "coreq": "coreqs", "coprereq": "coprereqs"}
+
+
+class CourseGraph:
+    """
+    Compiled dependency index for a set of courses.
+    Courses get dense integer IDs (in curriculum order) and each relation type is
+    stored as adjacency tuples in both directions:
+        forward[rel][i]: IDs of the courses that have course i as a `rel`
+                         (the direction edges are drawn: prerequisite -> course)
+        reverse[rel][i]: IDs of the courses that course i has as a `rel`
+                         (in the order they were added to the course)
+    References to names that are not in the curriculum are kept in `dangling`.
+    """
+
+    def __init__(self, courses: dict, version: int = 0):
+        self.version = version
+        self.names = list(courses)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        n = len(self.names)
+        forward = {rel: [[] for _ in range(n)] for rel in RELATIONS}
+        self.reverse = {rel: [] for rel in RELATIONS}
+        self.dangling = {}  # course name -> list of (relation, missing course name)
+        for i, name in enumerate(self.names):
+            course = courses[name]
+            for rel in RELATIONS:
+                deps = []
+                for dep_name in getattr(course, RELATION_ATTRIBUTES[rel]):
+                    j = self.index.get(dep_name)
+                    if j is None:
+                        self.dangling.setdefault(name, []).append((rel, dep_name))
+                        continue
+                    deps.append(j)
+                    forward[rel][j].append(i)
+                self.reverse[rel].append(tuple(deps))
+        self.forward = {rel: [tuple(adj) for adj in forward[rel]] for rel in RELATIONS}
+        # Results derived from this index (units, critical path, ...). The index is
+        # rebuilt whenever the curriculum changes, so these are per curriculum version.
+        self.cache = {}
+
+    def __getstate__(self):
+        # Only the graph's own results are pickled: entries other modules cache here
+        # (validation, scheduling, allocation, ...) are not in the catalog cache key
+        state = self.__dict__.copy()
+        state["cache"] = {key: value for key, value in self.cache.items() if isinstance(key, tuple) and key[0] == "closure"}
+        return state
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def id(self, name):
+        """
+        Returns the integer ID of a course name, or None if it is not in the index.
+        """
+        return self.index.get(name)
+
+    def requires(self, name, rel="prereq"):
+        """
+        Returns the names of the courses that `name` has as a `rel` (resolved names only).
+        """
+        i = self.index.get(name)
+        if i is None:
+            return []
+        return [self.names[j] for j in self.reverse[rel][i]]
+
+    def required_by(self, name, rel="prereq"):
+        """
+        Returns the names of the courses that have `name` as a `rel`.
+        """
+        i = self.index.get(name)
+        if i is None:
+            return []
+        return [self.names[j] for j in self.forward[rel][i]]
+
+    def neighbors(self, i):
+        """
+        Returns the IDs of all courses directly related to course i, in any relation and direction.
+        """
+        related = set()
+        for rel in RELATIONS:
+            related.update(self.forward[rel][i])
+            related.update(self.reverse[rel][i])
+        related.discard(i)
+        return related
+
+    def edge_count(self):
+        return sum(len(adj) for rel in RELATIONS for adj in self.reverse[rel])
+
+    def closure(self, relations=("prereq", "coprereq")):
+        """
+        Transitive closure over the given relations as integer bitsets (bit i stands
+        for course i). Returns (ancestors, descendants):
+            ancestors[i]:   every course that course i requires, directly or transitively
+            descendants[i]: every course that requires course i, directly or transitively
+        A course is never its own ancestor or descendant. Computed once per relation
+        set with one pass over the strongly connected components in each direction.
+        """
+        key = ("closure", tuple(relations))
+        if key in self.cache:
+            return self.cache[key]
+        n = len(self.names)
+
+        def successors(i):
+            for rel in relations:
+                yield from self.forward[rel][i]
+
+        components = strongly_connected_components(n, successors)  # Sinks first
+        component_of = [0] * n
+        masks = []
+        for c, members in enumerate(components):
+            mask = 0
+            for i in members:
+                component_of[i] = c
+                mask |= 1 << i
+            masks.append(mask)
+
+        below = [0] * len(components)  # Courses reachable from each component (excluding itself)
+        for c, members in enumerate(components):
+            reach = 0
+            for i in members:
+                for rel in relations:
+                    for k in self.forward[rel][i]:
+                        d = component_of[k]
+                        if d != c:
+                            reach |= masks[d] | below[d]
+            below[c] = reach
+        above = [0] * len(components)  # Courses that reach each component (excluding itself)
+        for c in range(len(components) - 1, -1, -1):
+            reach = 0
+            for i in components[c]:
+                for rel in relations:
+                    for j in self.reverse[rel][i]:
+                        d = component_of[j]
+                        if d != c:
+                            reach |= masks[d] | above[d]
+            above[c] = reach
+
+        # Members of a cycle reach each other
+        ancestors = []
+        descendants = []
+        for i in range(n):
+            c = component_of[i]
+            cycle = masks[c] & ~(1 << i)
+            ancestors.append(above[c] | cycle)
+            descendants.append(below[c] | cycle)
+        self.cache[key] = (ancestors, descendants)
+        return ancestors, descendants
+
+    def mask(self, names):
+        """
+        Returns the bitset of the given course names (unknown names are ignored).
+        """
+        mask = 0
+        for name in names:
+            i = self.index.get(name)
+            if i is not None:
+                mask |= 1 << i
+        return mask
+
+    def ids_in(self, mask):
+        """
+        Returns the course IDs in a bitset, in increasing order.
+        """
+        ids = []
+        while mask:
+            low = mask & -mask
+            ids.append(low.bit_length() - 1)
+            mask ^= low
+        return ids
+
+    def names_in(self, mask):
+        """
+        Returns the course names in a bitset, in curriculum order.
+        """
+        return [self.names[i] for i in self.ids_in(mask)]
+
+
+def strongly_connected_components(n, successors):
+    """
+    Tarjan's algorithm (iterative) over nodes 0..n-1.
+    successors(i) returns an iterable of the nodes i has edges to.
+    Returns the components as lists of node IDs in reverse topological order
+    (every component comes after all components reachable from it).
+    """
+    index_of = [-1] * n
+    lowlink = [0] * n
+    on_stack = [False] * n
+    stack = []
+    components = []
+    counter = 0
+    for root in range(n):
+        if index_of[root] != -1:
+            continue
+        work = [(root, iter(successors(root)))]
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        while work:
+            node, children = work[-1]
+            advanced = False
+            for child in children:
+                if index_of[child] == -1:
+                    index_of[child] = lowlink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack[child] = True
+                    work.append((child, iter(successors(child))))
+                    advanced = True
+                    break
+                if on_stack[child] and index_of[child] < lowlink[node]:
+                    lowlink[node] = index_of[child]
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if lowlink[node] < lowlink[parent]:
+                    lowlink[parent] = lowlink[node]
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
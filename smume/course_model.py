@@ -3,12 +3,11 @@
 class Course:
     """Defines a course with relationships and metadata."""
 
-    def __init__(self, name, credits, term=None, completed=False, critical_path=True, categories=None, full_name=None, note=None, ms_credits=None, writing_intensive=False, typical_semester=None, generic_for=None):
+    def __init__(self, name, credits, term=None, completed=False, categories=None, full_name=None, note=None, ms_credits=None, writing_intensive=False, typical_semester=None, generic_for=None):
         self.name = name
         self.credits = credits
         self.term = term
         self.completed = completed
-        self.critical_path = critical_path
         self.prereqs = []
         self.coreqs = []
         self.coprereqs = []
@@ -28,17 +27,36 @@ class Course:
             self.ms_credits = 0
         self.writing_intensive = writing_intensive
         self.generic_for = generic_for
+        self._owner = None  # Curriculum that registered this course, notified when dependencies change
+
+    @property
+    def critical_path(self):
+        """
+        True if the course has zero slack in its curriculum's critical path (see
+        Curriculum.critical_path); False for courses outside a curriculum.
+        """
+        if self._owner is None:
+            return False
+        info = self._owner.critical_path()["courses"].get(self.name)
+        return info is not None and info["slack"] == 0
+
+    def _changed(self):
+        if self._owner is not None:
+            self._owner._touch()
 
     def add_prereq(self, prereq_name):
         self.prereqs.append(prereq_name)
+        self._changed()
         return self
 
     def add_coreq(self, coreq_name):
         self.coreqs.append(coreq_name)
+        self._changed()
         return self
 
     def add_coprereq(self, coprereq_name):
         self.coprereqs.append(coprereq_name)
+        self._changed()
         return self
 
     def add_style(self, style_key, style_value):
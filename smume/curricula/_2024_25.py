@@ -8,9 +8,9 @@ curriculum = Curriculum("ME 2024-25")
 
 categories_def = {
     "C": {"name": "Core", "order": 0, "aliases": ["Core"]},
-    "F": {"name": "Foundation", "order": 1, "aliases": ["Foundation"]},
-    "Con": {"name": "Conversatio", "order": 2, "aliases": ["Conversatio"]},
-    "Ora": {"name": "Ora et Labora", "order": 3, "aliases": ["Ora et Labora"]},
+    "F": {"name": "Foundation", "order": 1, "aliases": ["Foundation"], "parent": "C"},
+    "Con": {"name": "Conversatio", "order": 2, "aliases": ["Conversatio"], "parent": "C"},
+    "Ora": {"name": "Ora et Labora", "order": 3, "aliases": ["Ora et Labora"], "parent": "C"},
     "MS": {"name": "Math and Science", "order": 4, "aliases": ["Math and Science"]},
     "GE": {"name": "General Engineering", "order": 5, "aliases": ["General Engineering"]},
     "ME": {"name": "Mechanical Engineering", "order": 6, "aliases": ["Mechanical Engineering"]},
@@ -105,6 +105,9 @@ curriculum.category_requirement("Ora", kind="Number of Courses", number=2, note=
 exemptions_DTA_AA = ["COR 100", "COR 120", "COR 210", "COR 220", "COR 240", "COR 250", "COR 310", "COR 320", "COR 330"]
 curriculum.set_DTA_exemptions("AA-DTA", exemptions_DTA_AA)
 
+# Check for prerequisite cycles and unknown course references (raises CurriculumValidationError)
+curriculum.validate()
+
 # Assign Terms
 generic_plan = GenericPlan(curriculum)
 generic_plan.apply_term_mapping({
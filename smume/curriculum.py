@@ -1,5 +1,7 @@
 from smume.course_model import Course
+from smume.course_graph import CourseGraph
 from smume.utils import normalize_categories
+from smume.allocation import credit_demands
 
 class Curriculum:
     """
@@ -9,35 +11,204 @@ class Curriculum:
     def __init__(self, name: str, categories_def: dict = None, ):
         self.name = name
         self.courses = {}
-        self.define_categories(categories_def or {})
-        self.category_requirements = {}
+        self.version = 0  # Bumped whenever the course set or a dependency changes
+        self._graph = None
+        self.category_credits = {}  # Running credit totals per category, for the implicit requirements
         self.explicit_category_requirements = {}
-        self.implicit_category_requirements = {}
-        self.update_implicit_category_requirements()
-        self.merge_category_requirements()
+        self._explicit_credit_categories = set()  # Categories with an explicit Number of Credits requirement
+        self._requirements = None  # (implicit, merged) requirements, built on first use
+        self.define_categories(categories_def or {})
         self.DTA_exemptions = {}
+        self.course_aliases = {}  # Other code (e.g., cross-listed) -> course name
 
     def course(self, name, credits, categories=None, **kwargs):
         """
         Creates and registers a course in the curriculum.
         Does not set term or completion status.
         """
-        categories = normalize_categories(categories, valid_categories=self.valid_categories)
-        course = Course(name, credits, categories=categories, **kwargs)
+        course = self.build_course(name, credits, categories=categories, **kwargs)
+        course._owner = self
+        if name in self.courses:
+            self._count_credits(self.courses[name], -1)
         self.courses[name] = course
+        self._count_credits(course, 1)
+        self._touch()
+        return course
+
+    def remove_course(self, name):
+        """
+        Removes a course from the curriculum.
+        """
+        if name not in self.courses:
+            raise KeyError(f"Course '{name}' not found in curriculum {self.name}.")
+        course = self.courses.pop(name)
+        course._owner = None
+        self._count_credits(course, -1)
+        self._touch()
+
+    def set_course_categories(self, name, categories):
+        """
+        Changes the categories of a course in the curriculum.
+        """
+        if name not in self.courses:
+            raise KeyError(f"Course '{name}' not found in curriculum {self.name}.")
+        course = self.courses[name]
+        categories = normalize_categories(categories, valid_categories=self.valid_categories)
+        self._count_credits(course, -1)
+        course.categories = categories
+        self._count_credits(course, 1)
+        self._touch()
         return course
+
+    def _count_credits(self, course, sign):
+        """
+        Adds (sign=1) or removes (sign=-1) a course's credits to the running
+        category totals, in O(number of categories of the course).
+        """
+        for category in dict.fromkeys(course.categories):
+            self.category_credits[category] = self.category_credits.get(category, 0) + sign * course.credits
+        self._requirements = None
+
+    def build_course(self, name, credits, categories=None, **kwargs):
+        """
+        Creates a course with this curriculum's categories without registering it.
+        Used for courses that belong to a single plan (e.g., transfer courses from a transcript).
+        """
+        categories = normalize_categories(categories, valid_categories=self.valid_categories)
+        return Course(name, credits, categories=categories, **kwargs)
     
+    def _touch(self):
+        """
+        Marks the curriculum as changed so that compiled indexes are rebuilt on next use.
+        """
+        self.version += 1
+
+    @property
+    def graph(self):
+        """
+        Returns the compiled dependency index (CourseGraph), rebuilding it if the
+        courses or their dependencies changed since it was last built.
+        """
+        if self._graph is None or self._graph.version != self.version:
+            self._graph = CourseGraph(self.courses, version=self.version)
+        return self._graph
+
+    def unlocks(self, *course_names, relations=("prereq", "coprereq")):
+        """
+        Returns the names of all courses downstream of the given courses, i.e., the
+        courses that require any of them directly or transitively.
+        """
+        graph = self.graph
+        _, descendants = graph.closure(relations)
+        mask = 0
+        for name in course_names:
+            i = graph.index.get(name)
+            if i is None:
+                raise KeyError(f"Course {name} not found in curriculum.")
+            mask |= descendants[i]
+        return graph.names_in(mask)
+
+    def requires_chain(self, *course_names, relations=("prereq", "coprereq")):
+        """
+        Returns the names of all courses upstream of the given courses, i.e., the
+        full chain of requirements behind them.
+        """
+        graph = self.graph
+        ancestors, _ = graph.closure(relations)
+        mask = 0
+        for name in course_names:
+            i = graph.index.get(name)
+            if i is None:
+                raise KeyError(f"Course {name} not found in curriculum.")
+            mask |= ancestors[i]
+        return graph.names_in(mask)
+
+    def validate(self, strict=True):
+        """
+        Checks the curriculum for prerequisite cycles, references to unknown courses
+        and courses blocked by them (see validation.validate_curriculum). The report
+        is cached until the curriculum changes. With strict=True, problems raise a
+        CurriculumValidationError; otherwise they are printed.
+        Returns the ValidationReport.
+        """
+        from smume.validation import validate_curriculum, CurriculumValidationError
+        report = validate_curriculum(self)
+        if not report.ok:
+            if strict:
+                raise CurriculumValidationError(report)
+            print(report)
+        return report
+
+    def critical_path(self):
+        """
+        Longest chain of prerequisites (critical path) through the curriculum.
+        Returns a dictionary with the number of terms on the longest chain ("length"),
+        the course names along one critical path ("path"), and per-course
+        "earliest" / "latest" term indices (0-based) and "slack" (terms a course can
+        slip without lengthening the curriculum). Cached per curriculum version.
+        """
+        from smume.scheduler import critical_path
+        graph = self.graph
+        if "critical_path_named" not in graph.cache:
+            result = critical_path(graph)
+            names = graph.names
+            graph.cache["critical_path_named"] = {
+                "length": result["length"],
+                "path": [names[i] for i in result["path"]],
+                "courses": {
+                    names[i]: {
+                        "earliest": result["earliest"][i],
+                        "latest": result["latest"][i],
+                        "slack": result["slack"][i],
+                    }
+                    for i in result["earliest"]
+                },
+            }
+        return graph.cache["critical_path_named"]
+
+    def critical_courses(self):
+        """
+        Returns the names of the courses with zero slack (on some critical path).
+        """
+        return [name for name, info in self.critical_path()["courses"].items() if info["slack"] == 0]
+
     def define_categories(self, categories_def: dict):
         """
         Defines the categories used in this curriculum.
         Categories are a dictionary mapping category names to their full names.
+        A category nested in another (e.g., "F" in "C") names it as its "parent";
+        its courses' credits then count toward the parent's credit requirement
+        (see allocation.category_hierarchy).
         """
-        self.categories = categories_def.keys() or []
+        parents = {cat: category["parent"] for cat, category in categories_def.items() if category.get("parent")}
+        for cat, parent in parents.items():
+            if parent not in categories_def:
+                raise ValueError(f"Category {cat} has an unknown parent category {parent}.")
+        self.categories = list(categories_def)
         self.category_names = {cat: category["name"] for cat, category in categories_def.items()}
+        self.category_parents = parents
         self.category_order = {category["name"]: category["order"] for category in categories_def.values()}
         self.valid_categories = {cat: cat for cat in self.categories}
         valid_aliases = {alias: cat for cat, aliases in categories_def.items() for alias in aliases}
         self.valid_categories.update(valid_aliases)
+        # One bit per category, for category membership tests and per-category totals
+        self.category_bits = {cat: 1 << i for i, cat in enumerate(self.categories)}
+        self._category_masks = {}
+        self._requirements = None
+
+    def category_mask(self, categories):
+        """
+        Returns the bitmask of a course's categories (see category_bits).
+        Unknown categories are ignored.
+        """
+        key = tuple(categories or ())
+        mask = self._category_masks.get(key)
+        if mask is None:
+            mask = 0
+            for cat in key:
+                mask |= self.category_bits.get(self.valid_categories.get(cat, cat), 0)
+            self._category_masks[key] = mask
+        return mask
 
     def category_requirement(self, category: str, kind: str, number: int = None, note: str = None):
         """
@@ -51,42 +222,87 @@ class Curriculum:
             "number": number,
             "note": note
         })
-        self.update_implicit_category_requirements() # Update implicit requirements
-        self.merge_category_requirements()  # Merge explicit and implicit requirements
+        if kind == "Number of Credits":
+            self._explicit_credit_categories.add(category)
+        self._requirements = None  # The implicit and merged requirements are rebuilt on next use
         return self
 
-    def update_implicit_category_requirements(self):
-        """
-        Updates the implicit category requirements based on courses.
-        If a category has no explicit Number of Credits requirements, we assume that all credits in that category must be completed.
-        """
+    def _implicit_requirements(self):
+        # A course in several top-level categories (e.g., ME and MS) is not required in full by each:
+        # their requirements are the credit shares of allocation.credit_demands. Other categories
+        # (e.g., F, nested in C) use the running category totals.
+        demands = credit_demands(self)
         implicit_reqs = {}
         for category in self.categories:
-            explicit_requirements = self.explicit_category_requirements.get(category, [])
-            if not any(req["kind"] == "Number of Credits" for req in explicit_requirements):
+            if category not in self._explicit_credit_categories:
                 # If no explicit Number of Credits requirements, assume all courses in category are required
-                # However, don't double count credits if course is in multiple categories
-                number_of_credits = sum(course.credits for course in self.courses.values() if category in course.categories)
                 implicit_reqs[category] = {
                     "kind": "Number of Credits",
-                    "number": number_of_credits,
+                    "number": demands.get(category, self.category_credits.get(category, 0)),
                     "note": f"All courses in {category} category must be completed"
                 }
-        self.implicit_category_requirements = implicit_reqs
+        return implicit_reqs
+
+    def _merged_requirements(self, implicit_requirements):
+        merged_requirements = {category: list(reqs) for category, reqs in self.explicit_category_requirements.items()}
+        for category, implicit_req in implicit_requirements.items():
+            if category not in merged_requirements:
+                merged_requirements[category] = []
+            merged_requirements[category].append(implicit_req)
+        return merged_requirements
+
+    def _build_requirements(self):
+        """
+        Returns the (implicit, merged) requirements, building them if a course or
+        requirement changed since they were last built.
+        """
+        if self._requirements is None:
+            implicit_requirements = self._implicit_requirements()
+            self._requirements = (implicit_requirements, self._merged_requirements(implicit_requirements))
+        return self._requirements
+
+    def update_implicit_category_requirements(self):
+        """
+        Updates the implicit category requirements based on courses.
+        If a category has no explicit Number of Credits requirements, we assume that all credits in that category must be completed.
+        A course in several top-level categories (e.g., ME and MS) is not required in full by each
+        (see allocation.credit_demands).
+        """
+        implicit_requirements = self._implicit_requirements()
+        self._requirements = (implicit_requirements, self._merged_requirements(implicit_requirements))
         return self.implicit_category_requirements
 
     def merge_category_requirements(self):
         """
         Merges explicit and implicit category requirements into a single dictionary (category_requirements).
         """
-        merged_requirements = self.explicit_category_requirements.copy()
-        for category, implicit_req in self.implicit_category_requirements.items():
-            if category not in merged_requirements:
-                merged_requirements[category] = []
-            merged_requirements[category].append(implicit_req)
-        self.category_requirements = merged_requirements
+        implicit_requirements = self.implicit_category_requirements
+        self._requirements = (implicit_requirements, self._merged_requirements(implicit_requirements))
         return self.category_requirements
+
+    @property
+    def implicit_category_requirements(self):
+        return self._build_requirements()[0]
+
+    @property
+    def category_requirements(self):
+        """
+        Explicit and implicit requirements by category, built lazily and cached
+        until a course or requirement changes. Read-only: add requirements with
+        category_requirement.
+        """
+        return self._build_requirements()[1]
     
+    def cross_list(self, name, *aliases):
+        """
+        Declares other codes of a course (e.g., cross-listed codes) so that
+        transcripts using them are matched to the course (see course_codes).
+        """
+        for alias in aliases:
+            self.course_aliases[alias] = name
+        self._touch()
+        return self
+
     def set_DTA_exemptions(self, name: str, course_exemptions: list):
         """
         Defines courses that are exempt from DTA requirements.
@@ -0,0 +1,131 @@
+# electives.py
+
+from collections import deque
+
+
+def elective_pools(curriculum):
+    """
+    Indexes the placeholder (generic) courses of a curriculum, i.e., courses with a
+    nonempty generic_for list. Returns (slots, pool_of): slots lists placeholder
+    names in curriculum order and pool_of maps each to a frozenset of the course
+    names it stands for. Slots with the same list share one frozenset.
+    Cached per curriculum version.
+    """
+    cache = curriculum.graph.cache
+    if "elective_pools" not in cache:
+        pools = {}  # frozenset -> the shared frozenset
+        pool_of = {}
+        for name, course in curriculum.courses.items():
+            if course.generic_for:
+                pool = frozenset(course.generic_for)
+                pool_of[name] = pools.setdefault(pool, pool)
+        cache["elective_pools"] = (list(pool_of), pool_of)
+    return cache["elective_pools"]
+
+
+def hopcroft_karp(adjacency, n_right):
+    """
+    Maximum bipartite matching (Hopcroft-Karp, O(E sqrt(V))).
+    adjacency[u] lists the right vertices (0..n_right-1) left vertex u may be
+    matched to, in order of preference. Returns match_left: for every left vertex
+    the matched right vertex, or -1.
+    """
+    n_left = len(adjacency)
+    match_left = [-1] * n_left
+    match_right = [-1] * n_right
+
+    # Greedy start in preference order
+    for u, options in enumerate(adjacency):
+        for v in options:
+            if match_right[v] == -1:
+                match_left[u], match_right[v] = v, u
+                break
+
+    while True:
+        # Layer the free left vertices and everything reachable by alternating paths
+        layer = [-1] * n_left
+        queue = deque(u for u in range(n_left) if match_left[u] == -1)
+        for u in queue:
+            layer[u] = 0
+        found = False
+        while queue:
+            u = queue.popleft()
+            for v in adjacency[u]:
+                w = match_right[v]
+                if w == -1:
+                    found = True
+                elif layer[w] == -1:
+                    layer[w] = layer[u] + 1
+                    queue.append(w)
+        if not found:
+            return match_left
+
+        # Augment along vertex-disjoint shortest paths (iterative DFS)
+        position = [0] * n_left
+        for root in range(n_left):
+            if match_left[root] != -1:
+                continue
+            path = [root]
+            while path:
+                u = path[-1]
+                options = adjacency[u]
+                advanced = False
+                while position[u] < len(options):
+                    v = options[position[u]]
+                    position[u] += 1
+                    w = match_right[v]
+                    if w == -1:
+                        # Flip the alternating path ending at v
+                        for x in reversed(path):
+                            match_left[x], match_right[v], v = v, x, match_left[x]
+                        path = []
+                        advanced = True
+                        break
+                    if layer[w] == layer[u] + 1:
+                        path.append(w)
+                        advanced = True
+                        break
+                if not advanced:
+                    layer[u] = -1  # Dead end for this phase
+                    path.pop()
+
+
+def assign_electives(plan):
+    """
+    Matches the plan's planned or completed courses to the placeholder slots they
+    can fill (the slots that are themselves planned or completed), so that every course fills at most one slot and as many slots as
+    possible are filled. Earlier courses are preferred for earlier slots.
+    Returns a dictionary:
+        "assigned": slot name -> course name,
+        "unfilled": slot names no course was matched to,
+        "unused":   planned/completed pool courses that fill no slot.
+    """
+    all_slots, pool_of = elective_pools(plan.curriculum)
+    slot_set = set(all_slots)
+    members = set().union(*pool_of.values()) if pool_of else set()
+    terms = plan._state.terms
+    completed = plan._state.completed
+    # Only slots still in the plan take part (e.g., not slots an earlier replace_generic_courses removed)
+    slots = [slot for slot in all_slots if terms.get(slot) is not None or slot in completed]
+
+    # Candidate courses: in some pool, planned or completed; earliest term first
+    candidates = [
+        name for name in plan.course_names
+        if name in members and name not in slot_set and (terms.get(name) is not None or name in completed)
+    ]
+    candidates.sort(key=lambda name: (terms.get(name) is None, terms.get(name) or 0))
+    candidate_index = {name: k for k, name in enumerate(candidates)}
+
+    options_by_pool = {}
+    for pool in set(pool_of.values()):
+        options_by_pool[pool] = [candidate_index[name] for name in candidates if name in pool]
+    adjacency = [options_by_pool[pool_of[slot]] for slot in slots]
+
+    match = hopcroft_karp(adjacency, len(candidates))
+    assigned = {slot: candidates[v] for slot, v in zip(slots, match) if v != -1}
+    used = set(assigned.values())
+    return {
+        "assigned": assigned,
+        "unfilled": [slot for slot, v in zip(slots, match) if v == -1],
+        "unused": [name for name in candidates if name not in used],
+    }
@@ -0,0 +1,76 @@
+# eligibility.py
+
+SAME_TERM_RELATIONS = ("coreq", "coprereq")  # Requirements that may be taken in the same term
+
+
+class EligibilityCounters:
+    """
+    Per-course counters of unmet requirements, for "which courses can be taken
+    next" queries. A requirement is met once its course is done (completed, or
+    in progress when that counts). For every course the counters hold
+        hard[i]: prerequisites that are not done,
+        soft[i]: corequisites and coprerequisites that are not done.
+    set_done updates the counters of the affected courses only (O(degree)), and
+    the set of courses with no unmet prerequisites is kept alongside.
+    """
+
+    def __init__(self, graph, done):
+        self.graph = graph
+        n = len(graph)
+        self.done = list(done)
+        self.hard = [0] * n
+        self.soft = [0] * n
+        for i in range(n):
+            self.hard[i] = sum(1 for j in graph.reverse["prereq"][i] if not self.done[j])
+            self.soft[i] = sum(1 for rel in SAME_TERM_RELATIONS for j in graph.reverse[rel][i] if not self.done[j])
+        self.ready = {i for i in range(n) if not self.done[i] and self.hard[i] == 0}
+        self._frontier = None
+
+    def set_done(self, i, done):
+        """
+        Marks course i as done (or not) and updates the counters of its dependents.
+        """
+        if self.done[i] == done:
+            return
+        graph = self.graph
+        self.done[i] = done
+        step = -1 if done else 1
+        for k in graph.forward["prereq"][i]:
+            self.hard[k] += step
+            if not self.done[k] and self.hard[k] == 0:
+                self.ready.add(k)
+            else:
+                self.ready.discard(k)
+        for rel in SAME_TERM_RELATIONS:
+            for k in graph.forward[rel][i]:
+                self.soft[k] += step
+        if done or self.hard[i] != 0:
+            self.ready.discard(i)
+        else:
+            self.ready.add(i)
+        self._frontier = None
+
+    def frontier(self):
+        """
+        Returns the IDs of the courses that can be taken next: not done, every
+        prerequisite done, and every corequisite/coprerequisite either done or
+        eligible itself (to be taken in the same term). Cached until set_done.
+        """
+        if self._frontier is not None:
+            return self._frontier
+        graph = self.graph
+        eligible = set(self.ready)
+        # Greatest fixpoint: drop courses that need a same-term requirement that is
+        # neither done nor eligible, then recheck the courses that depend on them
+        queue = [i for i in eligible if self.soft[i]]
+        while queue:
+            i = queue.pop()
+            if i not in eligible:
+                continue
+            if all(self.done[j] or j in eligible for rel in SAME_TERM_RELATIONS for j in graph.reverse[rel][i]):
+                continue
+            eligible.discard(i)
+            for rel in SAME_TERM_RELATIONS:
+                queue.extend(k for k in graph.forward[rel][i] if k in eligible)
+        self._frontier = frozenset(eligible)
+        return self._frontier
@@ -1,6 +1,11 @@
+import copy
 import re
+from types import MappingProxyType
 from smume.course_model import Course
-from smume.utils import term_sort_key, normalize_categories
+from smume.plan_state import PlanState, PlannedCourse
+from smume.terms import as_term
+from smume.registry import registry
+from smume.allocation import allocate_credits
 
 def catalog_to_module_name(catalog):
     """
@@ -18,8 +23,6 @@ def catalog_to_module_name(catalog):
     raise ValueError(f"Unrecognized catalog format: {catalog}")
 
 
-import importlib
-
 class GenericPlan:
     """
     A plan representing the default recommended sequence for a given catalog year.
@@ -27,68 +30,196 @@ class GenericPlan:
     """
 
     def __init__(self, catalog):
+        base_plan = None
         if isinstance(catalog, str):
             module_name = catalog_to_module_name(catalog)
-            mod = importlib.import_module(f"smume.curricula.{module_name}")
-            self.curriculum = mod.curriculum
+            # Loaded through the registry's LRU, from the compiled cache when the module source is unchanged
+            self.curriculum, base_plan = registry.load(f"smume.curricula.{module_name}")
             self.catalog = catalog
         else:
             self.curriculum = catalog
             self.catalog = str(catalog)
         self.name = self.curriculum.name
-        self.notes_generic = []
+        # Per-plan overlay (terms, completion, grades, substitutions); the curriculum itself is shared
+        self._state = base_plan._state.fork() if base_plan is not None else PlanState()
+        self._views = {}
+        # Every mutation bumps _version; derived views (courses, course_terms, ...)
+        # are memoized against it and the curriculum version
+        self._version = 0
+        self._view_cache = {}
+        # Live dependency violations (course name -> unmet), built on the first
+        # check_dependencies() call and then updated by set_term
+        self._violations = None
+        self._violations_graph = None
+        self.notes_generic = list(base_plan.notes_generic) if base_plan is not None else []
+
+    def fork(self):
+        """
+        Returns a copy of this plan for what-if edits. The copy shares the
+        curriculum and, until either plan writes, the term/completion state, so
+        forking is cheap; edits to the fork never affect this plan.
+        """
+        clone = copy.copy(self)
+        clone._state = self._state.fork()
+        clone._views = {}
+        clone._view_cache = {}
+        if self._violations is not None:
+            clone._violations = dict(self._violations)
+        clone.notes_generic = list(self.notes_generic)
+        return clone
+
+    def __getstate__(self):
+        # Course views and memoized results are rebuilt on demand after unpickling
+        state = self.__dict__.copy()
+        state["_views"] = {}
+        state["_view_cache"] = {}
+        state["_violations"] = None  # Read-only views do not pickle; rebuilt on the next check
+        state["_violations_graph"] = None
+        return state
+
+    def get_course_definition(self, course_name):
+        """
+        Returns the shared Course definition for a course name, including courses
+        known only to this plan. Returns None if the course is unknown.
+        """
+        course = self.curriculum.courses.get(course_name)
+        if course is None:
+            course = self._state.local_courses.get(course_name)
+        return course
+
+    def get_course(self, course_name):
+        """
+        Returns the plan's view of a course (definition plus this plan's term and
+        completion state), or None if the course is unknown.
+        """
+        view = self._views.get(course_name)
+        if view is None:
+            course = self.get_course_definition(course_name)
+            if course is None:
+                return None
+            view = self._views[course_name] = PlannedCourse(course, self)
+        return view
+
+    def has_course(self, course_name):
+        return course_name in self.curriculum.courses or course_name in self._state.local_courses
+
+    def _changed(self):
+        """
+        Marks the plan as changed so that memoized views are rebuilt on next use.
+        """
+        self._version += 1
+
+    def _memoized(self, key, build):
+        """
+        Returns build() memoized against the plan and curriculum versions.
+        """
+        version = (self._version, self.curriculum.version)
+        entry = self._view_cache.get(key)
+        if entry is None or entry[0] != version:
+            entry = self._view_cache[key] = (version, build())
+        return entry[1]
+
+    @property
+    def course_names(self):
+        """
+        Returns the names of all courses in the curriculum followed by the plan-local courses.
+        Memoized per plan version; treat the result as read-only.
+        """
+        def build():
+            names = list(self.curriculum.courses)
+            names.extend(name for name in self._state.local_courses if name not in self.curriculum.courses)
+            return names
+        return self._memoized("course_names", build)
+
+    def course_items(self):
+        """
+        Returns (name, course view) pairs for all courses known to the plan.
+        """
+        return [(name, self.get_course(name)) for name in self.course_names]
 
     @property
     def courses(self):
         """
         Returns all courses with a term assigned.
         This includes courses that are not yet completed.
+        Memoized per plan version; treat the result as read-only.
         """
-        return [course for course in self.courses_all if course.term]
+        return self._memoized("courses", lambda: [course for course in self.courses_all if course.term])
 
     @property
     def courses_all(self):
         """
-        Returns all courses in the curriculum.
+        Returns all courses in the curriculum (and plan-local courses) as seen by this plan.
+        Memoized per plan version; treat the result as read-only.
         """
-        return self.curriculum.courses.values()
+        return self._memoized("courses_all", lambda: [self.get_course(name) for name in self.course_names])
 
     @property
     def course_terms(self):
         """
         Returns a mapping of course names to their assigned terms.
+        Memoized per plan version; treat the result as read-only.
         """
-        return {
-            name: course.term for name, course in self.curriculum.courses.items()
-        }
+        terms = self._state.terms
+        return self._memoized("course_terms", lambda: {name: terms.get(name) for name in self.course_names})
 
     @property
     def course_categories(self):
         """
         Returns a dictionary mapping category names to lists of courses.
         A course may appear in multiple categories.
+        Memoized per plan version; treat the result as read-only.
         """
-        from collections import defaultdict
-        category_map = defaultdict(list)
-        for course in self.courses:
-            for category in course.categories:
-                category_map[category].append(course)
-        return dict(category_map)
+        def build():
+            category_map = {}
+            for course in self.courses:
+                for category in course.categories:
+                    category_map.setdefault(category, []).append(course)
+            return category_map
+        return self._memoized("course_categories", build)
 
     def get_term(self, course_name):
-        return self.course_terms.get(course_name)
+        return self._state.terms.get(course_name)
 
     def set_term(self, course_name, term):
-        if course_name in self.course_terms:
-            self.course_terms[course_name] = term
-        if course_name in self.curriculum.courses:
-            self.curriculum.courses[course_name].term = term
-    
+        if self.has_course(course_name):
+            self._state.set_term(course_name, as_term(term))
+            self._changed()
+            self._update_violations(course_name)
+
+    def mark_completed(self, course_name: str, completed: bool = True):
+        """
+        Marks a course as completed (or not completed) in this plan.
+        Dependency checks only look at terms, so the live violations are unaffected.
+        """
+        if not self.has_course(course_name):
+            raise KeyError(f"Course {course_name} not found in curriculum.")
+        self._state.set_completed(course_name, completed)
+        self._changed()
+
+    def update_record(self, course_name, **fields):
+        """
+        Stores transcript fields (letter_grade, grade, title, credits, ...) for a course in this plan.
+        """
+        self._state.update_record(course_name, **fields)
+        self._changed()
+
+    def add_local_course(self, name, credits, categories=None, **kwargs):
+        """
+        Defines a course known only to this plan (e.g., a transfer course from a transcript).
+        The shared curriculum is not modified.
+        """
+        course = self.curriculum.build_course(name, credits, categories=categories, **kwargs)
+        self._state.add_local_course(course)
+        self._views.pop(name, None)
+        self._changed()
+        return self.get_course(name)
+
     def add_course(self, course_name, term):
         """
         Adds a course to the plan with a specific term.
         """
-        if course_name not in self.curriculum.courses:
+        if not self.has_course(course_name):
             raise ValueError(f"Course '{course_name}' not found in curriculum.")
         
         self.set_term(course_name, term)
@@ -97,7 +228,7 @@ class GenericPlan:
         """
         Removes a course from the plan.
         """
-        if course_name not in self.curriculum.courses:
+        if not self.has_course(course_name):
             raise ValueError(f"Course '{course_name}' not found in curriculum.")
         
         self.set_term(course_name, None)
@@ -106,33 +237,31 @@ class GenericPlan:
         """
         Substitutes an old course with a new one.
         """
-        if old_name not in self.curriculum.courses:
+        if not self.has_course(old_name):
             raise ValueError(f"Course '{old_name}' not found in curriculum.")
-        if new_name not in self.curriculum.courses:
+        if not self.has_course(new_name):
             raise ValueError(f"Course '{new_name}' not found in curriculum.")
 
-        old_course = self.curriculum.courses[old_name]
-        new_course = self.curriculum.courses[new_name]
-
-        # Copy term and other attributes from the old course
-        new_course.term = old_course.term
-        new_course.completed = old_course.completed
-        new_course.critical_path = old_course.critical_path
+        # Copy term and completion from the old course
+        self.set_term(new_name, self.get_term(old_name))
+        self.mark_completed(new_name, old_name in self._state.completed)
+        self._state.add_substitution(old_name, new_name)
+        self._changed()
 
         # Remove the old course from the plan
-        old_course.term = None
+        self.set_term(old_name, None)
 
     def switch_writing_intensive(self, old_name, new_name):
         """
         Substitutes one writing intensive course for another and adds the non-writing intensive version of the old course.
         """
-        if old_name not in self.curriculum.courses:
+        if not self.has_course(old_name):
             raise ValueError(f"Course '{old_name}' not found in curriculum.")
-        if new_name not in self.curriculum.courses:
+        if not self.has_course(new_name):
             raise ValueError(f"Course '{new_name}' not found in curriculum.")
 
-        old_course = self.curriculum.courses[old_name]
-        new_course = self.curriculum.courses[new_name]
+        old_course = self.get_course(old_name)
+        new_course = self.get_course(new_name)
 
         # Ensure both courses are writing intensive
         if not old_course.writing_intensive or not new_course.writing_intensive:
@@ -140,9 +269,8 @@ class GenericPlan:
 
         # Find the non-writing intensive version of the old course
         non_writing_course_name = old_name.replace("W", "")
-        if non_writing_course_name not in self.curriculum.courses:
+        if not self.has_course(non_writing_course_name):
             raise ValueError(f"Non-writing intensive version '{non_writing_course_name}' not found in curriculum.")
-        non_writing_course = self.curriculum.courses[non_writing_course_name]
 
         # Add the non-writing intensive course to the plan by setting its term
         if old_course.term:
@@ -152,7 +280,7 @@ class GenericPlan:
         
         # Remove the non-writing intensive version of the new course
         non_writing_course_name = new_name.replace("W", "")
-        if non_writing_course_name in self.curriculum.courses:
+        if self.has_course(non_writing_course_name):
             self.remove_course(non_writing_course_name)
 
         # Substitute the old course with the new one
@@ -175,52 +303,105 @@ class GenericPlan:
         if check:
             return self.check_dependencies()
     
+    def last_term(self):
+        """
+        Returns the last term in the plan.
+        """
+        return max(self._state.terms.values(), default=None)
+
     def courses_by_term(self):
-        grouped = {}
-        for course in self.courses:
-            grouped.setdefault(course.term, []).append(course)
-        return grouped
+        """
+        Returns a dictionary mapping terms to the lists of courses planned in them.
+        Memoized per plan version; treat the result as read-only.
+        """
+        def build():
+            grouped = {}
+            for course in self.courses:
+                grouped.setdefault(course.term, []).append(course)
+            return grouped
+        return self._memoized("courses_by_term", build)
 
-    def check_dependencies(self):
+    def _unmet_dependencies(self, graph, i):
         """
-        Check for unmet prerequisites, corequisites, and coprerequisites
-        in the course plan. Returns a dictionary of problems keyed by course name.
+        Returns the unmet prerequisites, corequisites and coprerequisites of course i
+        (a graph ID) as a read-only mapping of relation -> tuple of names, or None
+        if it has no term or nothing is unmet.
         """
-        problems = {}
+        terms = self._state.terms
+        course_term = terms.get(graph.names[i])
+        if course_term is None:
+            return None
 
-        term_order = sorted(
-            {t for t in self.course_terms.values() if t is not None},
-            key=term_sort_key
-        )
-    
-        term_index = {term: i for i, term in enumerate(term_order)}
+        unmet = {"prereq": [], "coreq": [], "coprereq": []}
 
-        for course in self.courses:
-            course_term = self.course_terms.get(course.name)
-            course_index = term_index.get(course_term, -1)
+        for j in graph.reverse["prereq"][i]:
+            term = terms.get(graph.names[j])
+            if term is None or term >= course_term:
+                unmet["prereq"].append(graph.names[j])
 
-            unmet = {"prereq": [], "coreq": [], "coprereq": []}
+        for j in graph.reverse["coreq"][i]:
+            term = terms.get(graph.names[j])
+            if term is None or term != course_term:
+                unmet["coreq"].append(graph.names[j])
 
-            for pre in getattr(course, "prereqs", []):
-                pre_term = self.course_terms.get(pre)
-                if pre_term is None or term_index.get(pre_term, -1) >= course_index:
-                    unmet["prereq"].append(pre)
+        for j in graph.reverse["coprereq"][i]:
+            term = terms.get(graph.names[j])
+            if term is None or term > course_term:
+                unmet["coprereq"].append(graph.names[j])
 
-            for co in getattr(course, "coreqs", []):
-                co_term = self.course_terms.get(co)
-                if co_term is None or term_index.get(co_term, -1) != course_index:
-                    unmet["coreq"].append(co)
+        # References to courses missing from the curriculum can never be met
+        for rel, missing in graph.dangling.get(graph.names[i], ()):
+            unmet[rel].append(missing)
 
-            for copre in getattr(course, "coprereqs", []):
-                copre_term = self.course_terms.get(copre)
-                if copre_term is None or term_index.get(copre_term, -1) > course_index:
-                    unmet["coprereq"].append(copre)
+        if not any(unmet.values()):
+            return None
+        return MappingProxyType({rel: tuple(names) for rel, names in unmet.items()})
+
+    def _update_violations(self, course_name):
+        """
+        Rechecks the live violations after course_name moved: only the course itself
+        and the courses that depend on it (in any relation) can change status.
+        """
+        if self._violations is None:
+            return
+        graph = self.curriculum.graph
+        if graph is not self._violations_graph:
+            self._violations = None  # Curriculum changed; rebuild on the next check
+            return
+        i = graph.index.get(course_name)
+        if i is None:
+            return  # Plan-local courses carry no dependencies
+        affected = {i}
+        for rel in graph.forward:
+            affected.update(graph.forward[rel][i])
+        for k in affected:
+            unmet = self._unmet_dependencies(graph, k)
+            if unmet is None:
+                self._violations.pop(graph.names[k], None)
+            else:
+                self._violations[graph.names[k]] = unmet
 
-            if any(unmet.values()):
-                problems[course.name] = unmet
+    def check_dependencies(self):
+        """
+        Check for unmet prerequisites, corequisites, and coprerequisites
+        in the course plan. Returns a read-only mapping of problems keyed by course
+        name; each maps "prereq", "coreq" and "coprereq" to tuples of course names.
+        The first call checks every course (O(V+E)); afterwards set_term keeps the
+        result up to date by rechecking only the moved course and its dependents,
+        so later calls are O(1). The mapping is a live view that follows later
+        edits; copy it (dict(...)) to keep a snapshot.
+        """
+        graph = self.curriculum.graph
+        if self._violations is None or graph is not self._violations_graph:
+            violations = {}
+            for i, name in enumerate(graph.names):
+                unmet = self._unmet_dependencies(graph, i)
+                if unmet is not None:
+                    violations[name] = unmet
+            self._violations = violations
+            self._violations_graph = graph
+        return MappingProxyType(self._violations)
 
-        return problems
-    
     def print_dependency_issues(self):
         """
         Print any unmet prerequisites, corequisites, or coprerequisites.
@@ -239,10 +420,74 @@ class GenericPlan:
             if unmet["coprereq"]:
                 print(f"  - Unmet Coprerequisites: {', '.join(unmet['coprereq'])}")
 
-    def check_category_requirements(self):
+    def category_totals(self):
+        """
+        Returns, for every category of the curriculum, the planned and completed
+        totals used by the category requirements:
+            {category: {"planned": {"Number of Credits": ..., "Number of Courses": ...,
+                                    "Writing Intensive": ...},
+                        "completed": {...}}}
+        Computed in a single pass over the courses (grouped by category bitmask)
+        and memoized per plan version; treat the result as read-only.
+        """
+        def build():
+            curriculum = self.curriculum
+            # Per category mask: planned credits, courses, writing intensive, then the same for completed courses
+            by_mask = {}
+            for c in self.courses:
+                mask = curriculum.category_mask(c.categories)
+                sums = by_mask.get(mask)
+                if sums is None:
+                    sums = by_mask[mask] = [0, 0, 0, 0, 0, 0]
+                wi = 1 if c.writing_intensive else 0
+                sums[0] += c.credits
+                sums[1] += 1
+                sums[2] += wi
+                if c.completed:
+                    sums[3] += c.credits
+                    sums[4] += 1
+                    sums[5] += wi
+            totals = {}
+            for category, bit in curriculum.category_bits.items():
+                sums = [0, 0, 0, 0, 0, 0]
+                for mask, mask_sums in by_mask.items():
+                    if mask & bit:
+                        for k in range(6):
+                            sums[k] += mask_sums[k]
+                totals[category] = {
+                    "planned": {"Number of Credits": sums[0], "Number of Courses": sums[1], "Writing Intensive": sums[2]},
+                    "completed": {"Number of Credits": sums[3], "Number of Courses": sums[4], "Writing Intensive": sums[5]},
+                }
+            return totals
+        return self._memoized("category_totals", build)
+
+    def credit_allocation(self, completed_only: bool = False):
+        """
+        Returns the allocation of the plan's credits to the top-level category
+        credit requirements without double counting (see allocation.allocate_credits).
+        Memoized per plan version.
+        """
+        key = "credit_allocation_completed" if completed_only else "credit_allocation"
+        return self._memoized(key, lambda: allocate_credits(self, completed_only))
+
+    def _category_total(self, category, kind, completed_only):
+        if kind == "Number of Credits":
+            # Credits of top-level categories come from the allocation, so a course
+            # in two of them (e.g., ME and MS) is not counted twice
+            allocation = self.credit_allocation(completed_only)
+            if category in allocation.demands:
+                return allocation.allocated[category]
+        totals = self.category_totals().get(category)
+        if totals is None:
+            return 0
+        return totals["completed" if completed_only else "planned"][kind]
+
+    def check_category_requirements(self, completed_only: bool = False):
         """
         Check if the courses in the plan meet the category requirements defined in the curriculum.
         Returns a dictionary of unmet category requirements.
+        All requirements are checked against the totals of a single pass (see category_totals),
+        and the credits of top-level categories against the credit allocation (see credit_allocation).
         """
         unmet_requirements = {}
         checking_methods = {
@@ -261,7 +506,7 @@ class GenericPlan:
                     continue
                 # Call the checking method for this requirement kind
                 check_method = checking_methods[requirement["kind"]]
-                result = check_method(requirement, category)
+                result = check_method(requirement, category, completed_only)
                 if result:
                     if category not in unmet_requirements:
                         unmet_requirements[category] = {}
@@ -272,11 +517,7 @@ class GenericPlan:
         """
         Check if the plan meets the writing intensive requirements for a given category.
         """
-        if completed_only:
-            writing_courses = [c for c in self.courses if c.writing_intensive and c.completed and category in normalize_categories(c.categories, self.curriculum.valid_categories)]
-        else:
-            writing_courses = [c for c in self.courses if c.writing_intensive and category in normalize_categories(c.categories, self.curriculum.valid_categories)]
-        if len(writing_courses) < requirement.get("number", 1):
+        if self._category_total(category, "Writing Intensive", completed_only) < requirement.get("number", 1):
             return f"At least {requirement['number']} writing intensive course(s) required in {category}."
         return None
 
@@ -284,11 +525,7 @@ class GenericPlan:
         """
         Check if the plan meets the number of courses required for a given category.
         """
-        if completed_only:
-            courses_in_category = [c for c in self.courses if c.completed and category in c.categories]
-        else:
-            courses_in_category = [c for c in self.courses if category in c.categories]
-        if len(courses_in_category) < requirement.get("number", 1):
+        if self._category_total(category, "Number of Courses", completed_only) < requirement.get("number", 1):
             return f"At least {requirement['number']} course(s) required in {category}."
         return None
 
@@ -296,11 +533,7 @@ class GenericPlan:
         """
         Check if the plan meets the number of credits required for a given category.
         """
-        if completed_only:
-            credits_in_category = sum(c.credits for c in self.courses if c.completed and category in c.categories)
-        else:
-            credits_in_category = sum(c.credits for c in self.courses if category in c.categories)
-        if credits_in_category < requirement.get("number", 3):
+        if self._category_total(category, "Number of Credits", completed_only) < requirement.get("number", 3):
             return f"At least {requirement['number']} credits required in {category}."
         return None
     
@@ -335,11 +568,11 @@ class GenericPlan:
             if "kind" not in requirement:
                 return f"Missing requirement 'kind' for category '{category}'."
             if requirement["kind"] == "Writing Intensive":
-                result = self.check_writing_intensive(requirement, category)
+                result = self.check_writing_intensive(requirement, category, completed_only)
             elif requirement["kind"] == "Number of Courses":
-                result = self.check_number_of_courses(requirement, category)
+                result = self.check_number_of_courses(requirement, category, completed_only)
             elif requirement["kind"] == "Number of Credits":
-                result = self.check_number_of_credits(requirement, category)
+                result = self.check_number_of_credits(requirement, category, completed_only)
             else:
                 return False
             
@@ -369,12 +602,12 @@ class GenericPlan:
             if requirement["kind"] == requirement_kind:
                 if requirement_kind == "Number of Courses":
                     total_required += requirement.get("number", 1)
-                    total_completed += len([c for c in self.courses if category in c.categories and c.completed])
-                    total_planned += len([c for c in self.courses if category in c.categories])
                 elif requirement_kind == "Number of Credits":
                     total_required += requirement.get("number")
-                    total_planned += sum(c.credits for c in self.courses if category in c.categories)
-                    total_completed += sum(c.credits for c in self.courses if category in c.categories and c.completed)
+                else:
+                    continue
+                total_completed += self._category_total(category, requirement_kind, True)
+                total_planned += self._category_total(category, requirement_kind, False)
 
         if total_required == 0:
             return None
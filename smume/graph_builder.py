@@ -1,9 +1,8 @@
 # graph_builder.py
 
 from graphviz import Digraph
-from smume.utils import term_sort_key
 
-def build_graph(plan, include_transfer_term=False, output_path=None, format="png"):
+def build_graph(plan, include_transfer_term=False, output_path=None, format="png", highlight_violation_chains=False):
     graph = Digraph(format=format, engine='dot')
     graph.attr(rankdir='LR', newrank='true', compound='true', fontname='Palatino', fontsize='12')
 
@@ -30,16 +29,27 @@ def build_graph(plan, include_transfer_term=False, output_path=None, format="png
         "#5254a3", "#6b6ecf", "#9c9ede", "#3182bd", "#31a354"
     ]
 
-    sorted_terms = sorted(courses_by_term.keys(), key=term_sort_key)
+    sorted_terms = sorted(courses_by_term.keys())  # Terms sort by their integer ordinals
     term_cluster_ids = []
 
     # Check for dependency violations if method exists
     violations = plan.check_dependencies() if hasattr(plan, 'check_dependencies') else {}
+    violation_nodes = set(violations)
+    for v in violations.values():
+        for deps in (v.get('prereq', []), v.get('coreq', []), v.get('coprereq', [])):
+            violation_nodes.update(deps)
+    completed_names = {c.name for c in plan.courses if c.completed}
+    # Optionally outline the full upstream chain behind each violation (transitive closure lookup)
+    chain_nodes = set()
+    if highlight_violation_chains and violations:
+        curriculum = plan.curriculum
+        chain_nodes = set(curriculum.requires_chain(*[name for name in violations if name in curriculum.graph]))
+        chain_nodes -= violation_nodes
 
     # Create a subgraph for each term
     for idx, term in enumerate(sorted_terms):
         # Skip transfer term if not included explicitly
-        if "transfer" in term.lower() and not include_transfer_term:
+        if term.is_transfer and not include_transfer_term:
             continue
         cluster_name = f"cluster_{idx}"
         sub = Digraph(name=cluster_name)
@@ -49,12 +59,13 @@ def build_graph(plan, include_transfer_term=False, output_path=None, format="png
             term_label = f"Term: "
         # Add a semester icon emoji: * Fall 🍂, Spring 🌱, Summer ☀️
         print(f"Processing term: {term} with label: {term_label}")
-        if "-F" in term:
-            term_label += " 🍂 "
-        elif "-Su" in term:
-            term_label += " ☀️ "
-        elif "-S" in term:
-            term_label += " 🌱 "
+        if not term.is_generic:
+            if term.season == "F":
+                term_label += " 🍂 "
+            elif term.is_summer:
+                term_label += " ☀️ "
+            elif term.season == "S":
+                term_label += " 🌱 "
         sub.attr(rank='same', style='filled', color='#cecdc9',
                  label=f"<<B>{term_label}{term}</B><BR/><FONT POINT-SIZE=\"10\" COLOR=\"#6e6d6a\">{sum(c.credits for c in courses_by_term[term])} cr</FONT>>")
 
@@ -75,14 +86,13 @@ def build_graph(plan, include_transfer_term=False, output_path=None, format="png
                 'fontsize': '10',
                 'tooltip': getattr(course, 'note', ''),
             }
-            is_violation_node = course.name in violations or any(
-                course.name in deps
-                for v in violations.values()
-                for deps in [v.get('prereq', []) + v.get('coreq', []) + v.get('coprereq', [])]
-            )
-            if is_violation_node:
+            if course.name in violation_nodes:
                 style_attrs['color'] = 'red'
                 style_attrs['penwidth'] = '3'
+            elif course.name in chain_nodes:
+                style_attrs['color'] = '#e08214'
+                style_attrs['penwidth'] = '2'
+                style_attrs['style'] = 'filled,dashed'
             style_attrs.update(course.styles)
             sub.node(course.name, **style_attrs)
 
@@ -105,7 +115,7 @@ def build_graph(plan, include_transfer_term=False, output_path=None, format="png
         for prereq in course.prereqs:
             edge_color = edge_colors[color_index % len(edge_colors)]
             color_index += 1
-            completed = next((c for c in plan.courses if c.name == prereq and c.completed), None)
+            completed = prereq in completed_names
             is_violation = (
                 course.name in violations
                 and prereq in violations[course.name].get('prereq', [])
@@ -123,7 +133,7 @@ def build_graph(plan, include_transfer_term=False, output_path=None, format="png
         for coreq in course.coreqs:
             edge_color = edge_colors[color_index % len(edge_colors)]
             color_index += 1
-            completed = next((c for c in plan.courses if c.name == coreq and c.completed), None)
+            completed = coreq in completed_names
             is_violation = (
                 course.name in violations
                 and coreq in violations[course.name].get('coreq', [])
@@ -142,7 +152,7 @@ def build_graph(plan, include_transfer_term=False, output_path=None, format="png
         for coprereq in course.coprereqs:
             edge_color = edge_colors[color_index % len(edge_colors)]
             color_index += 1
-            completed = next((c for c in plan.courses if c.name == coprereq and c.completed), None)
+            completed = coprereq in completed_names
             is_violation = (
                 course.name in violations
                 and coprereq in violations[course.name].get('coprereq', [])
@@ -0,0 +1,167 @@
+# ingest.py
+
+import argparse
+import glob
+import hashlib
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from smume.catalog_cache import cache_dir
+from smume.transcript import iter_transcript_records
+
+TRANSCRIPT_PATTERNS = ("*.html", "*.htm")
+
+_parser_hash_value = None
+
+
+def _parser_hash():
+    # Records depend on the parser, so its source is part of the cache key
+    global _parser_hash_value
+    if _parser_hash_value is None:
+        import smume.transcript
+        with open(smume.transcript.__file__, "rb") as f:
+            _parser_hash_value = hashlib.sha256(f.read()).hexdigest()[:8]
+    return _parser_hash_value
+
+
+def transcript_cache_path(content_hash):
+    directory = cache_dir()
+    if directory is None:
+        return None
+    return os.path.join(directory, "transcripts", f"{content_hash}-{_parser_hash()}.json")
+
+
+def transcript_files(paths):
+    """
+    Expands a list of transcript files and directories (searched for *.html and
+    *.htm files, not recursively) into a sorted list of files.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for pattern in TRANSCRIPT_PATTERNS:
+                files += glob.glob(os.path.join(path, pattern))
+        else:
+            files.append(path)
+    return sorted(dict.fromkeys(files))
+
+
+def parse_transcript(content):
+    """
+    Returns the course records of a transcript's content (bytes, UTF-8).
+    """
+    return list(iter_transcript_records(io.StringIO(content.decode("utf-8"))))
+
+
+def _read_cache(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, records):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump(records, f)
+        os.replace(tmp_path, path)  # Atomic, so concurrent runs never read a partial file
+    except OSError as e:
+        print(f"Could not write transcript cache {path}: {e}", file=sys.stderr)  # Standard output may carry the records
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def ingest(paths, max_workers=None, use_cache=True):
+    """
+    Parses a batch of HTML transcripts (files, or directories of them) into
+    normalized course records (see transcript.iter_transcript_records).
+    Files are keyed by the hash of their content: unchanged transcripts are
+    read from the cache ($SMUME_CACHE_DIR/transcripts, if that variable is set)
+    and the rest are parsed, from the same bytes that were hashed, over a
+    process pool (max_workers=1 parses in this process).
+    Returns a dictionary of file -> result, in file order, where a result is
+        {"hash": ..., "records": [...], "cached": True/False}
+    or, for a file that could not be read or parsed, {"error": message}. A
+    failing file does not stop the batch.
+    """
+    results = {}
+    pending = {}  # file -> (content, content hash, cache path)
+    for path in transcript_files(paths):
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            content_hash = hashlib.sha256(content).hexdigest()
+        except OSError as e:
+            results[path] = {"error": str(e)}
+            continue
+        cached_path = transcript_cache_path(content_hash)
+        records = _read_cache(cached_path) if use_cache and cached_path is not None else None
+        if records is not None:
+            results[path] = {"hash": content_hash, "records": records, "cached": True}
+        else:
+            results[path] = None  # Keeps the file order
+            pending[path] = (content, content_hash, cached_path)
+
+    def finish(path, records):
+        _, content_hash, cached_path = pending[path]
+        results[path] = {"hash": content_hash, "records": records, "cached": False}
+        if cached_path is not None:
+            _write_json(cached_path, records)
+
+    if max_workers == 1 or len(pending) <= 1:
+        for path in pending:
+            try:
+                finish(path, parse_transcript(pending[path][0]))
+            except Exception as e:
+                results[path] = {"error": f"{type(e).__name__}: {e}"}
+        return results
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        # Workers parse the bytes that were hashed, so a file changed since is never cached under the old hash
+        futures = {path: pool.submit(parse_transcript, content) for path, (content, _, _) in pending.items()}
+        for path, future in futures.items():
+            try:
+                finish(path, future.result())
+            except Exception as e:
+                results[path] = {"error": f"{type(e).__name__}: {e}"}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m smume.ingest",
+        description="Parse HTML transcripts into course records (one JSON object per line).",
+    )
+    parser.add_argument("paths", nargs="+", help="transcript files or directories of transcripts")
+    parser.add_argument("-o", "--output", help="write the records to this file instead of standard output")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--no-cache", action="store_true", help="parse every transcript, ignoring the cache")
+    args = parser.parse_args(argv)
+
+    results = ingest(args.paths, max_workers=args.jobs, use_cache=not args.no_cache)
+    output = open(args.output, "w") if args.output else sys.stdout
+    failed = 0
+    try:
+        for path, result in results.items():
+            if "error" in result:
+                failed += 1
+                print(f"{path}: {result['error']}", file=sys.stderr)
+                continue
+            for record in result["records"]:
+                output.write(json.dumps({"file": path, **record}) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    parsed = sum(1 for result in results.values() if "error" not in result and not result["cached"])
+    cached = sum(1 for result in results.values() if "error" not in result and result["cached"])
+    print(f"{len(results)} transcripts: {parsed} parsed, {cached} cached, {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
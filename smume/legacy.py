@@ -0,0 +1,191 @@
+# legacy.py
+
+import glob
+import os
+import pickle
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from smume.catalog_cache import cache_dir, source_hash, write_cache
+from smume.curriculum import Curriculum
+
+# Catalogs written for the legacy renderer ("flowchart_generator copy.py"):
+# new_course(name, credits, term, completed) with chained add_prereq/add_coreq/add_coprereq/add_style
+LEGACY_FILE_PATTERN = "courses_20[0-9][0-9].py"
+
+legacy_categories_def = {
+    "C": {"name": "Core", "order": 0, "aliases": ["Core"]},
+    "MS": {"name": "Math and Science", "order": 1, "aliases": ["Math and Science"]},
+    "GE": {"name": "General Engineering", "order": 2, "aliases": ["General Engineering"]},
+    "ME": {"name": "Mechanical Engineering", "order": 3, "aliases": ["Mechanical Engineering"]},
+    "O": {"name": "Other", "order": 4, "aliases": ["Other"]},
+}
+
+# The legacy files have no categories; they are inferred from the course code prefix
+PREFIX_CATEGORIES = {"MTH": "MS", "PHY": "MS", "CHM": "MS", "GE": "GE", "ME": "ME", "COR": "C"}
+
+
+def legacy_dir():
+    """
+    Returns the directory of the legacy catalog files: $SMUME_LEGACY_DIR or old/ in the repository.
+    old/ is not part of the installed package, so installed copies need $SMUME_LEGACY_DIR.
+    """
+    return os.environ.get("SMUME_LEGACY_DIR") or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "old")
+
+
+def legacy_category(course_name):
+    prefix = re.match(r"[A-Z]+", course_name)
+    return PREFIX_CATEGORIES.get(prefix.group(0) if prefix else None, "O")
+
+
+def legacy_catalog(path):
+    """
+    Returns the catalog label of a legacy file, e.g. 'old/courses_2016.py' -> '2016-17'.
+    """
+    year = int(re.search(r"(\d{4})", os.path.basename(path)).group(1))
+    return f"{year}-{(year + 1) % 100:02d}"
+
+
+def legacy_files(directory=None):
+    """
+    Returns a dictionary of catalog label -> path of the legacy catalog files.
+    Files that already use the Curriculum model (e.g., the old/courses_2024.py
+    draft of smume/curricula/_2024_25.py) are not legacy and are skipped.
+    Raises FileNotFoundError if the directory does not exist.
+    """
+    directory = directory or legacy_dir()
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(
+            f"Legacy catalog directory {directory} not found. Set $SMUME_LEGACY_DIR to the directory "
+            "of the courses_20XX.py files (old/ in a source checkout)."
+        )
+    files = {}
+    for path in sorted(glob.glob(os.path.join(directory, LEGACY_FILE_PATTERN))):
+        with open(path) as f:
+            if "new_course(" not in f.read():
+                continue
+        files[legacy_catalog(path)] = path
+    return files
+
+
+def legacy_path(catalog):
+    """
+    Returns the path of the legacy file for a catalog label like '2016-17' (or a path).
+    """
+    if os.path.isfile(catalog):
+        return catalog
+    files = legacy_files()
+    match = re.search(r"(\d{4})", catalog)
+    label = legacy_catalog(match.group(1)) if match else catalog
+    if label not in files:
+        raise KeyError(f"No legacy catalog {catalog} in {legacy_dir()}.")
+    return files[label]
+
+
+def convert_legacy(path):
+    """
+    Runs a legacy catalog file against a new_course shim and returns the
+    equivalent (curriculum, generic_plan) pair. The term each course was
+    listed in ('1F'..'4S') becomes the generic plan's term.
+    """
+    from smume.generic_plan import GenericPlan
+
+    catalog = legacy_catalog(path)
+    curriculum = Curriculum(f"ME {catalog}")
+    curriculum.define_categories(legacy_categories_def)
+    term_map = {}
+    completed = []
+
+    def new_course(name, credits, term, completed_flag=False):
+        term_map.setdefault(term, []).append(name)
+        if completed_flag:
+            completed.append(name)
+        return curriculum.course(name, credits, categories=[legacy_category(name)])
+
+    with open(path) as f:
+        source = f.read()
+    exec(compile(source, path, "exec"), {"new_course": new_course, "__name__": "__legacy__"})
+
+    report = curriculum.validate(strict=False)
+    if not report.ok:
+        print(f"Legacy catalog {path}: {report}")
+
+    generic_plan = GenericPlan(curriculum)
+    generic_plan.apply_term_mapping(term_map)
+    for name in completed:
+        generic_plan.mark_completed(name)
+    return curriculum, generic_plan
+
+
+def legacy_cache_path(path):
+    if cache_dir() is None:
+        return None
+    with open(path, "rb") as f:
+        digest = source_hash("smume.legacy", extra=f.read())
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir(), f"legacy_{name}-{digest}.pickle")
+
+
+def load_legacy(catalog):
+    """
+    Returns the (curriculum, generic_plan) pair of a legacy catalog ('2016-17'
+    or a file path), from the compiled cache when caching is on and the file
+    (and the converter and model sources) are unchanged, else converting and
+    caching it.
+    """
+    path = legacy_path(catalog)
+    cached = legacy_cache_path(path)
+    if cached is not None:
+        try:
+            with open(cached, "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            pass
+    compiled = convert_legacy(path)
+    write_cache(cached, compiled)
+    return compiled
+
+
+def _render_legacy(path, output_dir, format):
+    from smume.graph_builder import build_graph
+    _, generic_plan = load_legacy(path)
+    output_path = os.path.join(output_dir, f"flowchart_{legacy_catalog(path)}")
+    build_graph(generic_plan, output_path=output_path, format=format)
+    return f"{output_path}.{format}"
+
+
+def render_all(output_dir="legacy_flowcharts", format="pdf", max_workers=None):
+    """
+    Renders the generic flowchart of every legacy catalog with build_graph,
+    spreading the catalogs over a process pool (max_workers=1 renders in this
+    process). Returns a dictionary of catalog label -> output file, or the
+    exception for catalogs that failed.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    files = legacy_files()
+    results = {}
+    if max_workers == 1 or len(files) <= 1:
+        for catalog, path in files.items():
+            try:
+                results[catalog] = _render_legacy(path, output_dir, format)
+            except Exception as e:
+                results[catalog] = e
+        return results
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {catalog: pool.submit(_render_legacy, path, output_dir, format) for catalog, path in files.items()}
+        for catalog, future in futures.items():
+            try:
+                results[catalog] = future.result()
+            except Exception as e:
+                results[catalog] = e
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else "legacy_flowcharts"
+    for catalog, result in render_all(output_dir).items():
+        if isinstance(result, Exception):
+            print(f"{catalog}: failed ({result})")
+        else:
+            print(f"{catalog}: {result}")
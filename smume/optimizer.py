@@ -0,0 +1,478 @@
+# optimizer.py
+
+import time
+
+from smume.course_graph import RELATIONS
+from smume.scheduler import dependency_units
+from smume.terms import Term, TermCalendar
+
+OBJECTIVES = ("terms", "overcap")
+CHECK_INTERVAL = 256  # Search nodes between reads of the clock
+FIT_CHECK_INTERVAL = 8  # _fit nodes also run a capacity check over every term, so they are far slower
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class _SearchDone(Exception):
+    pass
+
+
+class ScheduleResult:
+    """
+    Best schedule found by a ScheduleOptimizer run.
+        placement: course name -> assigned term
+        value:     objective value of the placement (number of terms from the start
+                   term, or number of terms over the credit cap)
+        bound:     proven lower bound on the optimal value
+        optimal:   True when value == bound (the search finished within its budget)
+    """
+
+    def __init__(self, objective, placement, value, bound, last_term, nodes, elapsed):
+        self.objective = objective
+        self.placement = placement
+        self.value = value
+        self.bound = bound
+        self.optimal = value == bound
+        self.last_term = last_term
+        self.nodes = nodes
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        status = "optimal" if self.optimal else f"lower bound {self.bound}"
+        return f"<ScheduleResult {self.objective}={self.value} ({status}), last term {self.last_term}, {self.nodes} nodes>"
+
+
+class ScheduleOptimizer:
+    """
+    Exact (branch-and-bound) scheduler for a plan's remaining courses.
+    Uses the same model as scheduler.schedule_with_credit_cap: courses that are
+    scheduled, incomplete and planned from start_term on are placed in calendar
+    terms such that
+        - prerequisites are in an earlier term, coprerequisites in the same or an
+          earlier term and corequisite groups share a term,
+        - every course of a unit whose members agree on a typical semester is
+          placed in that semester,
+        - a term's credits stay under its cap (a unit larger than the cap gets a
+          term to itself).
+    Terms are numbered 0, 1, ... from start_term. The search assigns units in
+    topological order, picking the ready unit with the least slack first and
+    trying its terms from the earliest on; partial schedules are pruned by the
+    latest feasible term of every unit and a capacity relaxation (per season).
+    Both objectives are anytime: when the time budget runs out, the best schedule
+    found so far is returned together with the best proven bound.
+    """
+
+    def __init__(self, plan, max_credits, term_overrides=None, start_term=None, calendar=None):
+        graph = plan.curriculum.graph
+        self.calendar = calendar = calendar or TermCalendar.for_policy()
+        terms = plan._state.terms
+        completed = plan._state.completed
+        if start_term is None:
+            start_term = calendar.next(plan.term_now)
+        start_term = Term.parse(start_term)
+        if start_term not in calendar:
+            start_term = calendar.next(start_term)
+        self.start_term = start_term
+        self.max_credits = max_credits
+        self.overrides = {Term.parse(term): cap for term, cap in (term_overrides or {}).items()}
+        self._terms = [start_term]
+
+        units, unit_of = dependency_units(graph)
+        movable = [
+            terms.get(name) is not None and name not in completed and terms[name] >= start_term
+            for name in graph.names
+        ]
+        self.names = []  # movable course names of each unit, in topological order
+        position_of = {}  # position in dependency_units -> unit index here
+        for position, members in enumerate(units):
+            names = [graph.names[i] for i in members if movable[i]]
+            if names:
+                position_of[position] = len(self.names)
+                self.names.append(names)
+        n = len(self.names)
+        self.credits = [sum(plan.get_course(name).credits for name in names) for names in self.names]
+        self.seasons = []
+        for names in self.names:
+            typical = {plan.get_course(name).typical_semester for name in names} - {None}
+            season = typical.pop() if len(typical) == 1 else None
+            self.seasons.append(season if season in calendar.seasons else None)
+
+        # Precedence between units (lag 1 for prerequisites, 0 otherwise) and release
+        # terms from requirements that stay where they are
+        self.release = [0] * n
+        lags = [{} for _ in range(n)]  # u -> {successor unit: lag}
+        for i, name in enumerate(graph.names):
+            if not movable[i]:
+                continue
+            u = position_of[unit_of[i]]
+            for rel in RELATIONS:
+                lag = 1 if rel == "prereq" else 0
+                deps = graph.reverse[rel][i]
+                if rel == "coreq":
+                    deps = deps + graph.forward[rel][i]
+                for j in deps:
+                    if movable[j]:
+                        v = position_of[unit_of[j]]
+                        if v != u and lags[v].get(u, -1) < lag:
+                            lags[v][u] = lag
+                    elif terms.get(graph.names[j]) is not None:
+                        bound = terms[graph.names[j]]
+                        if rel == "prereq":
+                            bound = calendar.next(bound)
+                        self.release[u] = max(self.release[u], self.index_of(bound))
+        self.successors = [list(successors.items()) for successors in lags]
+        self.predecessors = [[] for _ in range(n)]
+        for u, successors in enumerate(self.successors):
+            for v, lag in successors:
+                self.predecessors[v].append((u, lag))
+        self.nodes = 0
+
+    # Terms by index
+
+    def term_at(self, t):
+        while len(self._terms) <= t:
+            self._terms.append(self.calendar.next(self._terms[-1]))
+        return self._terms[t]
+
+    def index_of(self, term):
+        """
+        Index of the first calendar term at or after the given term (0 if before start_term).
+        """
+        term = Term.parse(term)
+        if term <= self.start_term:
+            return 0
+        return self.calendar.distance(self.start_term, term) + (0 if term in self.calendar else 1)
+
+    def cap_at(self, t):
+        return self.overrides.get(self.term_at(t), self.max_credits)
+
+    def allowed(self, u, t):
+        season = self.seasons[u]
+        return t >= 0 and (season is None or self.term_at(t).season == season)
+
+    # Bounds
+
+    def earliest(self):
+        """
+        Earliest index of every unit from precedence, releases and seasons alone.
+        """
+        es = []
+        for u in range(len(self.names)):
+            t = max([self.release[u]] + [es[p] + lag for p, lag in self.predecessors[u]])
+            while not self.allowed(u, t):
+                t += 1
+            es.append(t)
+        return es
+
+    def latest(self, horizon):
+        """
+        Latest index of every unit that still lets its successors finish within
+        `horizon` terms, or None if some unit cannot fit.
+        """
+        n = len(self.names)
+        es = self.earliest()
+        ls = [0] * n
+        for u in range(n - 1, -1, -1):
+            t = min([horizon - 1] + [ls[v] - lag for v, lag in self.successors[u]])
+            while t >= 0 and not self.allowed(u, t):
+                t -= 1
+            if t < es[u]:
+                return None
+            ls[u] = t
+        return ls
+
+    def _weights(self):
+        # Credits each unit certainly occupies in a single term (a unit over the cap
+        # fills its term; no term holds more than its cap otherwise)
+        smallest_cap = min([self.max_credits] + list(self.overrides.values()))
+        return [min(credits, smallest_cap) for credits in self.credits]
+
+    def lower_bound(self):
+        """
+        Lower bound on the number of terms: the longest precedence chain (with
+        seasons) and the number of terms needed to hold the credits of every
+        season-restricted group and of all units.
+        """
+        if not self.names:
+            return 0
+        bound = max(self.earliest()) + 1
+        weights = self._weights()
+        need = {None: sum(weights)}
+        for u, season in enumerate(self.seasons):
+            if season is not None:
+                need[season] = need.get(season, 0) + weights[u]
+        capacity = {key: 0 for key in need}
+        horizon = 0
+        while any(capacity[key] < need[key] for key in need):
+            cap = self.cap_at(horizon)
+            capacity[None] += cap
+            season = self.term_at(horizon).season
+            if season in capacity:
+                capacity[season] += cap
+            horizon += 1
+        return max(bound, horizon)
+
+    def _tick(self, deadline, interval=CHECK_INTERVAL):
+        self.nodes += 1
+        if deadline is not None and self.nodes % interval == 0 and time.monotonic() > deadline:
+            raise _OutOfTime()
+
+    def greedy(self):
+        """
+        List schedule under the hard caps: every unit, in topological order, goes to
+        the first term that its predecessors, release and season allow and that
+        still has room (an empty term always does). Returns the index of every unit.
+        """
+        slot = []
+        load = {}
+        for u, credits in enumerate(self.credits):
+            t = max([self.release[u]] + [slot[p] + lag for p, lag in self.predecessors[u]])
+            while not self.allowed(u, t) or (load.get(t) and load[t] + credits > self.cap_at(t)):
+                t += 1
+            slot.append(t)
+            load[t] = load.get(t, 0) + min(credits, self.cap_at(t))
+        return slot
+
+    # Objective: fewest terms
+
+    def _fit(self, horizon, deadline):
+        """
+        Depth-first search for a schedule within `horizon` terms under the hard caps.
+        Returns the index of every unit, or None if there is none.
+        """
+        ls = self.latest(horizon)
+        if ls is None:
+            return None
+        n = len(self.names)
+        credits, seasons, release = self.credits, self.seasons, self.release
+        weights = self._weights()
+        caps = [self.cap_at(t) for t in range(horizon)]
+        term_seasons = [self.term_at(t).season for t in range(horizon)]
+        restricted = set(seasons) - {None}
+        slot = [-1] * n
+        load = [0] * horizon
+        waiting = [len(preds) for preds in self.predecessors]
+        ready = {u for u in range(n) if waiting[u] == 0}
+
+        def capacity_ok():
+            # Earliest term of every unplaced unit given the placed ones, then the
+            # capacity that unplaced units can still use: a term's leftover counts
+            # only if some unplaced unit fits into it within that unit's window.
+            low = [0] * n
+            smallest = [None] * horizon
+            need = dict.fromkeys(restricted, 0)
+            need[None] = 0
+            for u in range(n):
+                if slot[u] >= 0:
+                    continue
+                t = max([release[u]] + [(slot[p] if slot[p] >= 0 else low[p]) + lag for p, lag in self.predecessors[u]])
+                while t <= ls[u] and not self.allowed(u, t):
+                    t += 1
+                if t > ls[u]:
+                    return False
+                low[u] = t
+                need[None] += weights[u]
+                if seasons[u] is not None:
+                    need[seasons[u]] += weights[u]
+                for t in range(t, ls[u] + 1):
+                    if seasons[u] is not None and term_seasons[t] != seasons[u]:
+                        continue
+                    size = credits[u] if load[t] else min(credits[u], caps[t])
+                    if smallest[t] is None or size < smallest[t]:
+                        smallest[t] = size
+            usable = dict.fromkeys(need, 0)
+            for t in range(horizon):
+                residual = caps[t] - load[t]
+                if smallest[t] is not None and smallest[t] <= residual:
+                    usable[None] += residual
+                    if term_seasons[t] in usable:
+                        usable[term_seasons[t]] += residual
+            return all(need[key] <= usable[key] for key in need)
+
+        def place(depth):
+            if depth == n:
+                return True
+            self._tick(deadline, FIT_CHECK_INTERVAL)
+            u = min(ready, key=lambda u: (ls[u], -credits[u], u))
+            lo = max([release[u]] + [slot[p] + lag for p, lag in self.predecessors[u]])
+            ready.remove(u)
+            for v, _ in self.successors[u]:
+                waiting[v] -= 1
+                if waiting[v] == 0:
+                    ready.add(v)
+            for t in range(lo, ls[u] + 1):
+                if not self.allowed(u, t) or (load[t] and load[t] + credits[u] > caps[t]):
+                    continue
+                used = min(credits[u], caps[t])  # A unit over the cap fills its term
+                slot[u] = t
+                load[t] += used
+                if capacity_ok() and place(depth + 1):
+                    return True
+                load[t] -= used
+                slot[u] = -1
+            for v, _ in self.successors[u]:
+                if waiting[v] == 0:
+                    ready.discard(v)
+                waiting[v] += 1
+            ready.add(u)
+            return False
+
+        if not capacity_ok():
+            return None
+        return slot if place(0) else None
+
+    def minimize_terms(self, time_budget=5.0):
+        """
+        Finds the schedule with the fewest terms under the hard credit caps.
+        A greedy list schedule (see greedy) is the first incumbent; the search then
+        repeatedly tries to fit everything in one term less until that is proven
+        impossible or the time budget (seconds) runs out.
+        """
+        started = time.monotonic()
+        deadline = started + time_budget
+        self.nodes = 0
+        lower = self.lower_bound()
+        best = self.greedy()
+        upper = max(best, default=-1) + 1
+        while upper > lower:
+            try:
+                found = self._fit(upper - 1, deadline)
+            except _OutOfTime:
+                break
+            if found is None:
+                lower = upper  # Nothing fits in one term less
+            else:
+                best = found
+                upper = max(best, default=-1) + 1
+        return self._result("terms", best, upper, lower, started)
+
+    # Objective: fewest terms over the cap
+
+    def minimize_overcap(self, max_terms, time_budget=5.0):
+        """
+        Finds the schedule within max_terms terms (from the start term) with the
+        fewest terms whose credits exceed their cap. Caps are soft here; dependency
+        and season constraints stay hard. Raises ValueError if the dependencies
+        alone need more than max_terms terms.
+        """
+        started = time.monotonic()
+        deadline = started + time_budget
+        self.nodes = 0
+        ls = self.latest(max_terms)
+        if ls is None:
+            raise ValueError(f"The remaining courses need more than {max_terms} terms.")
+        n = len(self.names)
+        credits = self.credits
+        caps = [self.cap_at(t) for t in range(max_terms)]
+        oversized = any(credits[u] > max(caps) for u in range(n))
+        lower = 1 if oversized or sum(credits) > sum(caps) else 0
+        if lower == 0:
+            # A schedule under the hard caps needs no overloaded term at all
+            try:
+                fit = self._fit(max_terms, deadline)
+            except _OutOfTime:
+                fit = None
+            else:
+                lower = 1 if fit is None else 0
+            if fit is not None:
+                return self._result("overcap", fit, 0, 0, started)
+
+        slot = [-1] * n
+        load = [0] * max_terms
+        waiting = [len(preds) for preds in self.predecessors]
+        ready = {u for u in range(n) if waiting[u] == 0}
+        best = {"slot": None, "cost": n + 1}
+        over = [0]
+
+        # Incumbent: one dive taking the best-looking term of every unit (always
+        # feasible, since every unit's window is nonempty given its predecessors')
+        for u in range(n):
+            lo = max([self.release[u]] + [slot[p] + lag for p, lag in self.predecessors[u]])
+            options = [t for t in range(lo, ls[u] + 1) if self.allowed(u, t)]
+            t = min(options, key=lambda t: (load[t] + credits[u] > caps[t], max(load[t] + credits[u] - caps[t], 0), t))
+            over[0] += load[t] <= caps[t] < load[t] + credits[u]
+            load[t] += credits[u]
+            slot[u] = t
+        best["slot"], best["cost"] = list(slot), over[0]
+        if best["cost"] == lower:
+            return self._result("overcap", best["slot"], best["cost"], lower, started)
+        slot = [-1] * n
+        load = [0] * max_terms
+        over = [0]
+
+        def place(depth):
+            if over[0] >= best["cost"]:
+                return
+            if depth == n:
+                best["slot"], best["cost"] = list(slot), over[0]
+                if over[0] == lower:
+                    raise _SearchDone()  # Cannot do better
+                return
+            self._tick(deadline)
+            u = min(ready, key=lambda u: (ls[u], -credits[u], u))
+            lo = max([self.release[u]] + [slot[p] + lag for p, lag in self.predecessors[u]])
+            options = [t for t in range(lo, ls[u] + 1) if self.allowed(u, t)]
+            # Terms with room first, then the least overloaded
+            options.sort(key=lambda t: (load[t] + credits[u] > caps[t], max(load[t] + credits[u] - caps[t], 0), t))
+            ready.remove(u)
+            for v, _ in self.successors[u]:
+                waiting[v] -= 1
+                if waiting[v] == 0:
+                    ready.add(v)
+            for t in options:
+                was_over = load[t] > caps[t]
+                load[t] += credits[u]
+                slot[u] = t
+                added = not was_over and load[t] > caps[t]
+                over[0] += added
+                place(depth + 1)
+                over[0] -= added
+                slot[u] = -1
+                load[t] -= credits[u]
+            for v, _ in self.successors[u]:
+                if waiting[v] == 0:
+                    ready.discard(v)
+                waiting[v] += 1
+            ready.add(u)
+
+        try:
+            place(0)
+            lower = best["cost"]  # Search finished: the best schedule is optimal
+        except (_SearchDone, _OutOfTime):
+            pass
+        return self._result("overcap", best["slot"], best["cost"], lower, started)
+
+    def _result(self, objective, slot, value, bound, started):
+        placement = {}
+        for u, names in enumerate(self.names):
+            for name in names:
+                placement[name] = self.term_at(slot[u])
+        last_term = self.term_at(max(slot)) if slot else None
+        return ScheduleResult(objective, placement, value, bound, last_term, self.nodes, time.monotonic() - started)
+
+
+def optimize_schedule(plan, max_credits, objective="terms", time_budget=5.0, max_terms=None,
+                      term_overrides=None, start_term=None, calendar=None, apply=True):
+    """
+    Optimizes the plan's remaining courses with a ScheduleOptimizer.
+        objective="terms":   fewest terms under the credit caps,
+        objective="overcap": fewest terms over the caps within max_terms terms
+                             (default: as many terms as the current plan uses).
+    Returns a ScheduleResult; with apply=True its placement is written to the plan.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Invalid objective: {objective}. Must be one of: {', '.join(OBJECTIVES)}.")
+    optimizer = ScheduleOptimizer(plan, max_credits, term_overrides, start_term, calendar)
+    if objective == "terms":
+        result = optimizer.minimize_terms(time_budget)
+    else:
+        if max_terms is None:
+            planned = [plan.get_term(name) for names in optimizer.names for name in names]
+            max_terms = max([optimizer.index_of(term) for term in planned], default=0) + 1
+        result = optimizer.minimize_overcap(max_terms, time_budget)
+    if apply:
+        for name, term in result.placement.items():
+            plan.set_term(name, term)
+    return result
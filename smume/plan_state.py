@@ -0,0 +1,133 @@
+# plan_state.py
+
+class PlanState:
+    """
+    Per-plan overlay of the course state that changes from student to student.
+    Holds only term assignments, completion, transcript records (grades, credits),
+    substitutions, and courses known to this plan alone (e.g., transfer courses
+    from a transcript). The Course definitions in the Curriculum are never written.
+
+    Forking is copy-on-write: a fork shares every container with its parent until
+    either side writes, so many plans can be created from one generic plan cheaply.
+    """
+
+    __slots__ = ("terms", "completed", "records", "substitutions", "local_courses", "_shared")
+
+    def __init__(self):
+        self.terms = {}  # course name -> term label
+        self.completed = set()  # names of completed courses
+        self.records = {}  # course name -> dict of transcript fields (letter_grade, grade, credits, ...)
+        self.substitutions = {}  # old course name -> new course name
+        self.local_courses = {}  # course name -> Course defined only for this plan
+        self._shared = False
+
+    def fork(self):
+        """
+        Returns a new state that shares all containers with this one until a write.
+        """
+        child = PlanState.__new__(PlanState)
+        child.terms = self.terms
+        child.completed = self.completed
+        child.records = self.records
+        child.substitutions = self.substitutions
+        child.local_courses = self.local_courses
+        child._shared = True
+        self._shared = True
+        return child
+
+    def _own(self):
+        """
+        Copies the shared containers before the first write after a fork.
+        """
+        if self._shared:
+            self.terms = dict(self.terms)
+            self.completed = set(self.completed)
+            self.records = {name: dict(record) for name, record in self.records.items()}
+            self.substitutions = dict(self.substitutions)
+            self.local_courses = dict(self.local_courses)
+            self._shared = False
+
+    def set_term(self, course_name, term):
+        self._own()
+        if term is None:
+            self.terms.pop(course_name, None)
+        else:
+            self.terms[course_name] = term
+
+    def set_completed(self, course_name, completed=True):
+        self._own()
+        if completed:
+            self.completed.add(course_name)
+        else:
+            self.completed.discard(course_name)
+
+    def update_record(self, course_name, **fields):
+        self._own()
+        self.records.setdefault(course_name, {}).update(fields)
+
+    def add_substitution(self, old_name, new_name):
+        self._own()
+        self.substitutions[old_name] = new_name
+
+    def add_local_course(self, course):
+        self._own()
+        self.local_courses[course.name] = course
+
+
+class PlannedCourse:
+    """
+    A Course as seen through a plan: definition attributes (prereqs, categories,
+    notes, ...) come from the shared Course, while term, completion and transcript
+    fields come from the plan's state. Writes go through the plan.
+    """
+
+    __slots__ = ("_course", "_plan")
+
+    def __init__(self, course, plan):
+        self._course = course
+        self._plan = plan
+
+    @property
+    def course(self):
+        """
+        Returns the underlying (shared) Course definition.
+        """
+        return self._course
+
+    @property
+    def term(self):
+        return self._plan._state.terms.get(self._course.name)
+
+    @term.setter
+    def term(self, term):
+        self._plan.set_term(self._course.name, term)
+
+    @property
+    def completed(self):
+        return self._course.name in self._plan._state.completed
+
+    @completed.setter
+    def completed(self, completed):
+        self._plan.mark_completed(self._course.name, completed)
+
+    @property
+    def credits(self):
+        record = self._plan._state.records.get(self._course.name)
+        if record and "credits" in record:
+            return record["credits"]
+        return self._course.credits
+
+    def set_completed(self, completed=True):
+        self._plan.mark_completed(self._course.name, completed)
+        return self
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        record = self._plan._state.records.get(self._course.name)
+        if record and attr in record:
+            return record[attr]
+        return getattr(self._course, attr)
+
+    def __repr__(self):
+        return f"<PlannedCourse {self._course.name} term={self.term!r} completed={self.completed}>"
@@ -0,0 +1,163 @@
+# registry.py
+
+import hashlib
+import importlib.util
+import json
+import os
+import pkgutil
+from collections import OrderedDict
+
+from smume.catalog_cache import load_catalog
+
+CURRICULA_PACKAGE = "smume.curricula"
+MANIFEST_NAME = "manifest.json"
+
+
+def _package_dir(package=CURRICULA_PACKAGE):
+    spec = importlib.util.find_spec(package)  # Imports only the (empty) package, not its modules
+    return list(spec.submodule_search_locations)[0]
+
+
+def _module_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def module_to_catalog(module_name):
+    """
+    Returns the catalog label of a catalog module name, e.g. '_2024_25' -> '2024-25'.
+    """
+    parts = module_name.rsplit(".", 1)[-1].strip("_").split("_")
+    return "-".join(parts)
+
+
+class CatalogRegistry:
+    """
+    Lists the catalog modules of smume.curricula without running their code and
+    loads catalogs on first use.
+    Modules are discovered with pkgutil; their display names and course counts
+    come from manifest.json in the package (see write_manifest), and an entry is
+    marked stale when its module changed since the manifest was written.
+    Loaded catalogs are kept in an LRU cache of at most `maxsize` catalogs
+    (default: $SMUME_REGISTRY_SIZE or 4), so a long-running process serving many
+    catalog years keeps a bounded number of curricula in memory.
+    """
+
+    def __init__(self, maxsize=None, package=CURRICULA_PACKAGE):
+        if maxsize is None:
+            maxsize = int(os.environ.get("SMUME_REGISTRY_SIZE", 4))
+        self.maxsize = maxsize
+        self.package = package
+        self._loaded = OrderedDict()  # module name -> (curriculum, generic_plan)
+
+    def _manifest(self):
+        path = os.path.join(_package_dir(self.package), MANIFEST_NAME)
+        try:
+            with open(path) as f:
+                return {entry["module"]: entry for entry in json.load(f)}
+        except (OSError, ValueError):
+            return {}
+
+    def catalogs(self):
+        """
+        Returns one dictionary per catalog module: module, catalog label, name and
+        number of courses (None when the manifest has no entry), and whether the
+        manifest entry is stale.
+        """
+        directory = _package_dir(self.package)
+        manifest = self._manifest()
+        catalogs = []
+        for info in sorted(pkgutil.iter_modules([directory]), key=lambda info: info.name):
+            if info.ispkg:
+                continue
+            module_name = f"{self.package}.{info.name}"
+            entry = manifest.get(module_name, {})
+            source = os.path.join(directory, f"{info.name}.py")
+            catalogs.append({
+                "module": module_name,
+                "catalog": entry.get("catalog", module_to_catalog(info.name)),
+                "name": entry.get("name"),
+                "courses": entry.get("courses"),
+                "stale": not entry or not os.path.exists(source) or entry.get("hash") != _module_hash(source),
+            })
+        return catalogs
+
+    def module_name(self, catalog):
+        """
+        Returns the module name for a catalog label like '2024-25' (or a module name).
+        """
+        if catalog.startswith(f"{self.package}."):
+            return catalog
+        from smume.generic_plan import catalog_to_module_name
+        return f"{self.package}.{catalog_to_module_name(catalog)}"
+
+    def load(self, catalog):
+        """
+        Returns the (curriculum, generic_plan) pair of a catalog, loading it (from
+        the compiled cache when possible) on first use. Catalogs without a module
+        in the package fall back to the legacy files in old/ (see smume.legacy).
+        """
+        module_name = self.module_name(catalog)
+        compiled = self._loaded.get(module_name)
+        if compiled is not None:
+            self._loaded.move_to_end(module_name)
+            return compiled
+        if importlib.util.find_spec(module_name) is None:
+            from smume.legacy import load_legacy
+            compiled = load_legacy(catalog)
+        else:
+            compiled = load_catalog(module_name, use_imported=False)  # Evicted catalogs must not stay in sys.modules
+        self._loaded[module_name] = compiled
+        while len(self._loaded) > self.maxsize:
+            self._loaded.popitem(last=False)
+        return compiled
+
+    def curriculum(self, catalog):
+        return self.load(catalog)[0]
+
+    def resize(self, maxsize):
+        """
+        Changes the LRU size, dropping the least recently used catalogs if needed.
+        """
+        self.maxsize = maxsize
+        while len(self._loaded) > self.maxsize:
+            self._loaded.popitem(last=False)
+
+    def write_manifest(self):
+        """
+        Loads every catalog module once and writes manifest.json with its catalog
+        label, name, number of courses and source hash. Returns the entries.
+        """
+        directory = _package_dir(self.package)
+        entries = []
+        for info in sorted(pkgutil.iter_modules([directory]), key=lambda info: info.name):
+            if info.ispkg:
+                continue
+            module_name = f"{self.package}.{info.name}"
+            curriculum, _ = load_catalog(module_name, use_imported=False)
+            entries.append({
+                "module": module_name,
+                "catalog": module_to_catalog(info.name),
+                "name": curriculum.name,
+                "courses": len(curriculum.courses),
+                "hash": _module_hash(os.path.join(directory, f"{info.name}.py")),
+            })
+        with open(os.path.join(directory, MANIFEST_NAME), "w") as f:
+            json.dump(entries, f, indent=2)
+            f.write("\n")
+        return entries
+
+
+registry = CatalogRegistry()
+
+
+def list_catalogs():
+    """
+    Returns the available catalogs (see CatalogRegistry.catalogs) without loading them.
+    """
+    return registry.catalogs()
+
+
+if __name__ == "__main__":
+    for entry in registry.write_manifest():
+        print(f"{entry['catalog']}: {entry['name']} ({entry['courses']} courses)")
@@ -0,0 +1,430 @@
+# scheduler.py
+
+from smume.course_graph import RELATIONS, strongly_connected_components
+from smume.terms import Term, TermCalendar
+
+
+def dependency_units(graph, relations=RELATIONS):
+    """
+    Groups courses into scheduling units and orders them topologically.
+    Edges run from a requirement to the course that requires it; corequisites
+    add edges in both directions, so corequisite groups (and mutual
+    coprerequisites) collapse into one strongly connected unit whose members
+    must share a term.
+    Returns (units, unit_of): units is a list of lists of course IDs in
+    topological order, unit_of maps each course ID to its unit's position.
+    Results are cached on the graph.
+    """
+    key = ("units", tuple(relations))
+    if key in graph.cache:
+        return graph.cache[key]
+    use_coreq = "coreq" in relations
+    directed = [rel for rel in relations if rel != "coreq"]
+
+    def successors(i):
+        for rel in directed:
+            yield from graph.forward[rel][i]
+        if use_coreq:
+            yield from graph.forward["coreq"][i]
+            yield from graph.reverse["coreq"][i]
+
+    units = strongly_connected_components(len(graph), successors)
+    units.reverse()  # Tarjan emits sinks first
+    unit_of = [0] * len(graph)
+    for position, members in enumerate(units):
+        for i in members:
+            unit_of[i] = position
+    graph.cache[key] = (units, unit_of)
+    return units, unit_of
+
+
+def schedule_earliest(plan, relations=RELATIONS, calendar=None):
+    """
+    Moves every scheduled, incomplete course to its earliest feasible term in a
+    single topological sweep over the dependency units (O(V+E)):
+        - prerequisites must be in an earlier term (the next calendar term after
+          the prerequisite is the earliest option),
+        - coprerequisites must be in the same or an earlier term,
+        - corequisites must be in the same term.
+    Courses are never moved earlier than their current term, completed courses
+    are never moved, and requirements without a term are ignored.
+    Returns a dictionary of moved courses: name -> (old term, new term).
+    """
+    graph = plan.curriculum.graph
+    calendar = calendar or TermCalendar.for_policy()
+    terms = plan._state.terms
+    completed = plan._state.completed
+    units, unit_of = dependency_units(graph, relations)
+
+    current = [terms.get(name) for name in graph.names]
+    final = list(current)
+    movable = [term is not None and name not in completed for name, term in zip(graph.names, current)]
+    cyclic = []  # units with a prerequisite between two members (cannot be satisfied)
+
+    for position, members in enumerate(units):
+        bound = None
+        fixed = None
+        has_cycle = False
+        for i in members:
+            if not movable[i]:
+                if final[i] is not None and len(members) > 1 and (fixed is None or final[i] > fixed):
+                    fixed = final[i]
+                continue
+            if bound is None or current[i] > bound:
+                bound = current[i]
+            for rel in relations:
+                for j in graph.reverse[rel][i]:
+                    dep_term = final[j]
+                    if dep_term is None:
+                        continue
+                    if unit_of[j] == position:
+                        has_cycle = has_cycle or rel == "prereq"
+                        continue
+                    if rel == "prereq":
+                        dep_term = calendar.next(dep_term)
+                    if dep_term > bound:
+                        bound = dep_term
+        if has_cycle:
+            cyclic.append(members)
+        if bound is None:
+            continue  # Nothing movable in this unit
+        if fixed is not None and fixed > bound:
+            bound = fixed
+        for i in members:
+            if movable[i]:
+                final[i] = Term(bound)
+
+    moved = {}
+    for i, name in enumerate(graph.names):
+        if movable[i] and final[i] != current[i]:
+            moved[name] = (current[i], final[i])
+            plan.set_term(name, final[i])
+            print(f"Moved {name} from {current[i]} to {final[i]} to satisfy its dependencies.")
+    for members in cyclic:
+        print(f"Warning: prerequisite cycle among {', '.join(graph.names[i] for i in members)}; cannot be satisfied.")
+    return moved
+
+
+def failure_impact(plan, failed, calendar=None):
+    """
+    Computes what happens downstream if the given courses are failed or dropped:
+    each failed course is retaken in the next calendar term after its current term
+    (its typical semester, if it has one), and only the courses that depend on it
+    are pushed later as needed, in topological order. The affected courses are
+    the downstream closure of graph.closure, extended with corequisite partners,
+    so the dependents of a corequisite partner that slips are included too. Every other course keeps
+    its term, and the plan is not modified.
+    Returns a dictionary:
+        "retake":   failed course name -> retake term,
+        "slipped":  course name -> (old term, new term, number of terms slipped),
+        "graduation_term": the plan's last term after the slips,
+        "previous_graduation_term": the plan's last term before.
+    """
+    graph = plan.curriculum.graph
+    calendar = calendar or TermCalendar.for_policy()
+    terms = plan._state.terms
+    completed = plan._state.completed
+    units, unit_of = dependency_units(graph)
+
+    def aligned(term, members):
+        typical = {plan.get_course(graph.names[i]).typical_semester for i in members} - {None}
+        season = typical.pop() if len(typical) == 1 else None
+        if season in calendar.seasons:
+            return calendar.next_occurrence(term, season, inclusive=True)
+        return term
+
+    failed_ids = set()
+    for name in failed:
+        i = graph.index.get(name)
+        if i is None:
+            raise KeyError(f"Course {name} not found in curriculum.")
+        failed_ids.add(i)
+
+    # Downstream closure (cached on the graph), extended with the corequisite
+    # partners of every reached course, whose own dependents slip with them
+    _, descendants = graph.closure(RELATIONS)
+    affected = 0
+    pending = list(failed_ids)
+    while pending:
+        for k in units[unit_of[pending.pop()]]:
+            reach = (descendants[k] | 1 << k) & ~affected
+            if reach:
+                affected |= reach
+                pending += graph.ids_in(reach)
+    positions = sorted({unit_of[i] for i in graph.ids_in(affected)})
+
+    new_terms = {}  # course ID -> new term
+    retake = {}
+    for position in positions:
+        members = [
+            i for i in units[position]
+            if i in failed_ids or (terms.get(graph.names[i]) is not None and graph.names[i] not in completed)
+        ]
+        if not members:
+            continue
+        bound = max(terms.get(graph.names[i]) or plan.term_now for i in members)
+        if any(i in failed_ids for i in members):
+            bound = calendar.next(max(bound, plan.term_now))
+        for i in members:
+            for rel in RELATIONS:
+                for j in graph.reverse[rel][i]:
+                    if unit_of[j] == position:
+                        continue
+                    dep_term = new_terms.get(j, terms.get(graph.names[j]))
+                    if dep_term is None:
+                        continue
+                    if rel == "prereq":
+                        dep_term = calendar.next(dep_term)
+                    if dep_term > bound:
+                        bound = dep_term
+        current = max(terms.get(graph.names[i]) or bound for i in members)
+        if bound > current or any(i in failed_ids for i in members):
+            bound = aligned(bound, members)
+        for i in members:
+            if i in failed_ids:
+                retake[graph.names[i]] = bound
+            if bound != terms.get(graph.names[i]):
+                new_terms[i] = bound
+
+    slipped = {}
+    for i, term in sorted(new_terms.items(), key=lambda item: (item[1], item[0])):
+        name = graph.names[i]
+        if i in failed_ids:
+            continue
+        old = terms[name]
+        slipped[name] = (old, term, calendar.distance(old, term))
+    previous = plan.last_term()
+    graduation = max([previous] + list(new_terms.values())) if previous is not None else None
+    return {
+        "retake": retake,
+        "slipped": slipped,
+        "graduation_term": graduation,
+        "previous_graduation_term": previous,
+    }
+
+
+def chain_lengths(graph, units, unit_of, relations=RELATIONS):
+    """
+    Returns, for each unit, the length of the longest dependency chain that
+    starts at it, counted in terms: a prerequisite edge adds one term, while
+    coprerequisite and corequisite edges add none.
+    """
+    lengths = [0] * len(units)
+    for position in range(len(units) - 1, -1, -1):
+        longest = 0
+        for i in units[position]:
+            for rel in relations:
+                step = 1 if rel == "prereq" else 0
+                for k in graph.forward[rel][i]:
+                    other = unit_of[k]
+                    if other != position and lengths[other] + step > longest:
+                        longest = lengths[other] + step
+        lengths[position] = longest
+    return lengths
+
+
+def critical_path(graph, include=None, term_seasons=None, typical=None):
+    """
+    Longest-path (critical path) analysis over the prerequisite/coprerequisite DAG
+    of dependency units. A prerequisite edge costs one term; coprerequisite and
+    corequisite edges cost none. `include` optionally lists the course IDs to
+    consider (e.g., only the courses a student still has to take); requirements
+    outside it are treated as satisfied.
+    With `term_seasons` (the seasons term indices cycle through, starting at
+    index 0, e.g. ('F', 'S')) and `typical` (course ID -> typical semester), a
+    unit whose members agree on a season in term_seasons only takes term indices
+    of that season, as in schedule_with_credit_cap.
+    Returns a dictionary:
+        "length":  number of terms on the longest chain,
+        "path":    course IDs along one critical path (in order),
+        "earliest": {course ID: earliest term index (0-based)},
+        "latest":   {course ID: latest term index that does not delay the end},
+        "slack":    {course ID: latest - earliest}.
+    Without `include` and seasons, the result is cached on the graph.
+    """
+    cached = include is None and not (term_seasons and typical)
+    if cached and "critical_path" in graph.cache:
+        return graph.cache["critical_path"]
+    units, unit_of = dependency_units(graph)
+    included = [True] * len(graph) if include is None else [False] * len(graph)
+    if include is not None:
+        for i in include:
+            included[i] = True
+    active = [any(included[i] for i in members) for members in units]
+
+    seasons = [None] * len(units)  # Season a unit's term indices must have, or None
+    if term_seasons and typical:
+        for u, members in enumerate(units):
+            agreed = {typical.get(i) for i in members if included[i]} - {None}
+            season = agreed.pop() if len(agreed) == 1 else None
+            seasons[u] = season if season in term_seasons else None
+
+    def align(u, t, step):
+        # Nearest index from t (moving by step) that has the unit's season
+        while seasons[u] is not None and term_seasons[t % len(term_seasons)] != seasons[u]:
+            t += step
+        return t
+
+    def edges(u):
+        # (successor unit, weight) pairs leaving unit u
+        for i in units[u]:
+            if not included[i]:
+                continue
+            for rel in RELATIONS:
+                weight = 1 if rel == "prereq" else 0
+                for k in graph.forward[rel][i]:
+                    v = unit_of[k]
+                    if v != u and included[k]:
+                        yield v, weight
+
+    bound = [0] * len(units)  # Earliest index from the predecessors alone
+    earliest = [0] * len(units)
+    for u in range(len(units)):
+        if active[u]:
+            earliest[u] = align(u, bound[u], 1)
+            for v, weight in edges(u):
+                if earliest[u] + weight > bound[v]:
+                    bound[v] = earliest[u] + weight
+    length = max((earliest[u] + 1 for u in range(len(units)) if active[u]), default=0)
+    latest = [length - 1] * len(units)
+    for u in range(len(units) - 1, -1, -1):
+        if active[u]:
+            for v, weight in edges(u):
+                if latest[v] - weight < latest[u]:
+                    latest[u] = latest[v] - weight
+            latest[u] = align(u, latest[u], -1)
+
+    # Follow zero-slack units from a zero-slack unit that no predecessor holds back
+    path = []
+    u = next((u for u in range(len(units)) if active[u] and bound[u] == 0 and latest[u] == earliest[u]), None)
+    while u is not None:
+        path.extend(i for i in units[u] if included[i])
+        u = next((v for v, weight in edges(u)
+                  if latest[v] == earliest[v] and align(v, earliest[u] + weight, 1) == earliest[v]), None)
+
+    result = {"length": length, "path": path, "earliest": {}, "latest": {}, "slack": {}}
+    for u, members in enumerate(units):
+        for i in members:
+            if included[i]:
+                result["earliest"][i] = earliest[u]
+                result["latest"][i] = latest[u]
+                result["slack"][i] = latest[u] - earliest[u]
+    if cached:
+        graph.cache["critical_path"] = result
+    return result
+
+
+def schedule_with_credit_cap(plan, max_credits, term_overrides=None, start_term=None, calendar=None):
+    """
+    List-schedules the plan's remaining courses under a per-term credit cap.
+    Courses that are completed, unscheduled, or planned before `start_term`
+    (default: the term after the plan's current term) stay where they are.
+    Every other course is placed from `start_term` on:
+        - a unit (a course, or a corequisite group) becomes ready once all of
+          its requirements are placed (prerequisites in an earlier term,
+          coprerequisites in the same or an earlier term),
+        - ready units are taken from a priority queue ordered by the longest
+          remaining dependency chain, then by credits,
+        - a unit is only placed in a term that matches the typical semester of
+          its members and fits under the term's cap (`term_overrides` maps
+          terms to caps); a unit larger than the cap gets a term to itself.
+    Returns a dictionary of course name -> assigned term.
+    """
+    import heapq
+
+    graph = plan.curriculum.graph
+    calendar = calendar or TermCalendar.for_policy()
+    terms = plan._state.terms
+    completed = plan._state.completed
+    if start_term is None:
+        start_term = calendar.next(plan.term_now)
+    start_term = Term.parse(start_term)
+    overrides = {Term.parse(term): cap for term, cap in (term_overrides or {}).items()}
+
+    units, unit_of = dependency_units(graph)
+    lengths = chain_lengths(graph, units, unit_of)
+    movable = [
+        terms.get(name) is not None and name not in completed and terms[name] >= start_term
+        for name in graph.names
+    ]
+
+    members_of = []  # movable members of each unit
+    credits = []
+    seasons = []  # season the unit must be placed in, or None
+    for members in units:
+        movable_members = [i for i in members if movable[i]]
+        members_of.append(movable_members)
+        credits.append(sum(plan.get_course(graph.names[i]).credits for i in movable_members))
+        typical = {plan.get_course(graph.names[i]).typical_semester for i in movable_members} - {None}
+        season = typical.pop() if len(typical) == 1 else None
+        seasons.append(season if season in calendar.seasons else None)
+
+    # Count the unplaced requirements of every unit and note the earliest term it may take
+    pending = [0] * len(units)
+    earliest = [start_term] * len(units)
+    for position, members in enumerate(members_of):
+        for i in members:
+            for rel in RELATIONS:
+                for j in graph.reverse[rel][i]:
+                    if unit_of[j] != position and movable[j]:
+                        pending[position] += 1
+
+    def priority(position):
+        return (-lengths[position], -credits[position], graph.names[members_of[position][0]])
+
+    waiting = []  # (earliest term, priority, unit) for units whose requirements are all placed
+    for position, members in enumerate(members_of):
+        if members and pending[position] == 0:
+            heapq.heappush(waiting, (earliest[position], priority(position), position))
+
+    remaining = sum(1 for members in members_of if members)
+    placement = {}
+    term = start_term
+    deferred = []
+    max_terms = 4 * remaining + 8
+    for _ in range(max_terms):
+        if remaining == 0:
+            break
+        cap = overrides.get(term, max_credits)
+        load = 0
+        ready = [(p, u) for p, u in deferred]
+        deferred = []
+        while waiting and waiting[0][0] <= term:
+            _, p, u = heapq.heappop(waiting)
+            ready.append((p, u))
+        heapq.heapify(ready)
+        while ready:
+            p, u = heapq.heappop(ready)
+            if seasons[u] is not None and term.season != seasons[u]:
+                deferred.append((p, u))
+                continue
+            if load and load + credits[u] > cap:
+                deferred.append((p, u))
+                continue
+            load += credits[u]
+            remaining -= 1
+            for i in members_of[u]:
+                placement[graph.names[i]] = term
+            # Release the units that depend on this one
+            for i in members_of[u]:
+                for rel in RELATIONS:
+                    for k in graph.forward[rel][i]:
+                        v = unit_of[k]
+                        if v == u or not movable[k]:
+                            continue
+                        bound = calendar.next(term) if rel == "prereq" else term
+                        if bound > earliest[v]:
+                            earliest[v] = bound
+                        pending[v] -= 1
+                        if pending[v] == 0:
+                            if earliest[v] <= term:
+                                heapq.heappush(ready, (priority(v), v))
+                            else:
+                                heapq.heappush(waiting, (earliest[v], priority(v), v))
+        term = calendar.next(term)
+    if remaining:
+        raise RuntimeError(f"Could not place {remaining} course group(s) under a cap of {max_credits} credits.")
+
+    for name, term in placement.items():
+        plan.set_term(name, term)
+    return placement
@@ -1,5 +1,11 @@
-import re
 from smume.generic_plan import GenericPlan
+from smume.terms import Term, TermCalendar
+from smume.scheduler import schedule_earliest, schedule_with_credit_cap, critical_path, failure_impact
+from smume.optimizer import optimize_schedule
+from smume.electives import assign_electives
+from smume.eligibility import EligibilityCounters
+from smume.transcript import iter_transcript_records
+from smume.course_codes import course_code_normalizer
 import datetime
 
 class StudentPlan(GenericPlan):
@@ -9,6 +15,7 @@ class StudentPlan(GenericPlan):
     """
 
     def __init__(self, catalog: str, start_year: int, start_semester: str = "Fall", student_name: str = None, student_id: str = None, DTA: str = None):
+        self._eligibility = {}  # include_in_progress -> EligibilityCounters (see eligible_courses)
         super().__init__(catalog)
         self.start_year = start_year
         self.start_semester = start_semester  # "Fall" or "Spring"
@@ -19,6 +26,44 @@ class StudentPlan(GenericPlan):
         self._DTA = DTA
         self.notes = []  # Store student-specific notes
     
+    def fork(self):
+        """
+        Returns a cheap copy of this plan for what-if edits (see GenericPlan.fork).
+        """
+        clone = super().fork()
+        clone.notes = list(self.notes)
+        clone._eligibility = {}
+        return clone
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state["_eligibility"] = {}
+        return state
+
+    @property
+    def term_now(self):
+        """
+        The current term: courses before it count as done, and courses in it as
+        in progress (see eligible_courses).
+        """
+        return self._term_now
+
+    @term_now.setter
+    def term_now(self, term_now):
+        self._term_now = Term.parse(term_now)
+        self._eligibility = {}  # In-progress courses depend on the current term
+
+    def set_term(self, course_name, term):
+        super().set_term(course_name, term)
+        self._update_eligibility(course_name)
+
+    def mark_completed(self, course_name: str, completed: bool = True):
+        """
+        Marks a course as completed (or not completed) in this plan.
+        """
+        super().mark_completed(course_name, completed)
+        self._update_eligibility(course_name)
+
     @property
     def DTA(self):
         """
@@ -49,7 +94,7 @@ class StudentPlan(GenericPlan):
             # If DTA is set, mark all DTA courses as completed. Check also for W versions of exempted courses.
             w_versions = [course_name + "W" for course_name in self.curriculum.DTA_exemptions.get(self._DTA, [])]
             for course_name in self.curriculum.DTA_exemptions.get(self._DTA, []) + w_versions:
-                if course_name in self.curriculum.courses:
+                if self.has_course(course_name):
                     # If there is a W writing intensive version, switch it to the non-W version ... I don't think this is necessary
                     # if course_name.endswith("W"):
                     #     term = self.courses_by_term.get(course_name, None) # Get the term of the W version
@@ -61,8 +106,7 @@ class StudentPlan(GenericPlan):
                     #     self.set_course_term(course_name, term.year, term.semester)  # Add the non-W version back to the plan
                     # If the course is not already completed, mark it as completed
                     # Mark the course as completed
-                    course = self.curriculum.courses[course_name]
-                    course.set_completed(True)
+                    self.mark_completed(course_name)
                     self.set_term(course_name, "0000-Transfer")
                     print(f"  Marking {course_name} as completed due to DTA exemption.")
         else:
@@ -70,7 +114,7 @@ class StudentPlan(GenericPlan):
     
     def get_term_now(self):
         """
-        Returns the current academic term as a normalized term label.
+        Returns the current academic term as a Term.
         """
         now = datetime.datetime.now()
         year = now.year
@@ -78,235 +122,299 @@ class StudentPlan(GenericPlan):
         semester = "F" if now.month in [8, 9, 10, 11, 12] else "S" if now.month in [1, 2, 3, 4, 5] else "Su"
         return self._normalize_term_label(year, semester)
     
-    def set_term_now(self, term_now: str):
+    def set_term_now(self, term_now):
         """
-        Sets the current term to a specific normalized term label.
+        Sets the current term to a specific term (a Term or a label like '2025-F').
         """
-        if not re.match(r"^\d{4}-(F|S|Su|Transfer)$", term_now):
+        try:
+            self.term_now = term_now
+        except ValueError:
             raise ValueError(f"Invalid term format: {term_now}. Expected format is 'YYYY-F', 'YYYY-S', 'YYYY-Su', or 'YYYY-Transfer'.")
-        self.term_now = term_now
 
     def move_unfinished_courses_forward(self):
         """
         Moves unfinished courses from planned terms past to the upcoming term (relative to the current term).
         """
         print(f"Moving unfinished courses from past terms to the next term after {self.term_now}.")
-        current_year, current_semester = self.extract_year_and_semester(self.term_now)
-        for course_name, course in self.curriculum.courses.items():
+        next_term = self.calendar().next(self.get_term_now())
+        for course_name, course in self.course_items():
             if course.term is not None:
                 if not course.completed:
                     term = course.term
                     if self.is_term_past(term):
                         # Move to the term after the current term
-                        next_term = self.get_term_after(self.get_term_now())
-                        next_year, next_semester = self.extract_year_and_semester(next_term)
-                        self.set_course_term(course.name, next_year, next_semester)
+                        self.set_course_term(course.name, term=next_term)
                         print(f"Moved {course.name} from {term} to {next_term}.")
 
-    def is_term_past(self, term_label: str):
+    def is_term_past(self, term_label):
         """
-        Checks if the given term label is in the past compared to the current term.
+        Checks if the given term is in the past compared to the current term.
         """
-        current_year, current_semester = self.extract_year_and_semester(self.term_now)
-        term_year, term_semester = self.extract_year_and_semester(term_label)
-        if term_year < current_year:
-            return True
-        semester_order =  ["S", "Su", "Su1", "Su2", "F"]
-        if term_year == current_year and semester_order.index(term_semester) < semester_order.index(current_semester):
-            return True
-        return False
+        return Term.parse(term_label) < self.term_now
     
-    def get_term_after(self, term_label: str, skip_summer=True, skip_half_terms=True):
+    def calendar(self, skip_summer=True, skip_half_terms=True):
         """
-        Gets the term label for the term after the given term.
+        Returns the precomputed TermCalendar for a skip policy.
         """
-        year, semester = self.extract_year_and_semester(term_label)
-        all_semesters = ["S", "Su", "Su1", "Su2", "F"]
-        if skip_summer:
-            semester_order = ["S", "F"]
-        elif skip_half_terms:
-            semester_order = ["S", "Su", "F"]
-        else:
-            semester_order = all_semesters
-        current_index = all_semesters.index(semester)
-        for i in range(current_index + 1, len(all_semesters)):
-            if i < len(all_semesters):
-                next_semester = all_semesters[i]
-                if next_semester in semester_order:
-                    return f"{year}-{next_semester}"
-        # If we reach the end of the semester list, increment the year and start from the first valid semester
-        year += 1
-        for i in range(len(all_semesters)):
-            next_semester = all_semesters[i]
-            if next_semester in semester_order:
-                return f"{year}-{next_semester}"
+        return TermCalendar.for_policy(skip_summer=skip_summer, skip_half_terms=skip_half_terms)
+
+    def get_term_after(self, term_label, skip_summer=True, skip_half_terms=True):
+        """
+        Gets the term after the given term.
+        """
+        return self.calendar(skip_summer, skip_half_terms).next(term_label)
             
-    def get_term_before(self, term_label: str, skip_summer=True, skip_half_terms=True):
+    def get_term_before(self, term_label, skip_summer=True, skip_half_terms=True):
         """
-        Gets the term label for the term before the given term.
+        Gets the term before the given term.
         """
-        year, semester = self.extract_year_and_semester(term_label)
-        all_semesters = ["S", "Su", "Su1", "Su2", "F"]
-        if skip_summer:
-            semester_order = ["S", "F"]
-        elif skip_half_terms:
-            semester_order = ["S", "Su", "F"]
-        else:
-            semester_order = all_semesters
-        current_index = all_semesters.index(semester)
-        for i in range(current_index - 1, -1, -1):
-            if i >= 0:
-                prev_semester = all_semesters[i]
-                if prev_semester in semester_order:
-                    return f"{year}-{prev_semester}"
-        # If we reach the beginning of the semester list, decrement the year and start from the last valid semester
-        year -= 1
-        for i in range(len(all_semesters) - 1, -1, -1):
-            prev_semester = all_semesters[i]
-            if prev_semester in semester_order:
-                return f"{year}-{prev_semester}"
+        return self.calendar(skip_summer, skip_half_terms).previous(term_label)
             
+    def enforce_dependencies(self, relations=("prereq", "coreq", "coprereq")):
+        """
+        Moves courses forward to the earliest terms in which all of their prerequisites,
+        coprerequisites and corequisites are satisfied, in a single topological sweep.
+        Corequisite groups are scheduled together. Returns the moved courses as
+        a dictionary of name -> (old term, new term).
+        """
+        return schedule_earliest(self, relations=relations, calendar=self.calendar())
+
+    def schedule_with_credit_cap(self, max_credits, term_overrides: dict = None, skip_summer=True, skip_half_terms=True):
+        """
+        Re-plans the remaining courses from the term after the current term, taking
+        at most max_credits per term (term_overrides maps terms like '2026-F' to
+        their own caps). Courses on the longest remaining dependency chains are
+        placed first and each course's typical semester is respected.
+        Returns a dictionary of course name -> assigned term.
+        """
+        calendar = self.calendar(skip_summer, skip_half_terms)
+        placement = schedule_with_credit_cap(self, max_credits, term_overrides=term_overrides, calendar=calendar)
+        print(f"Scheduled {len(placement)} courses with at most {max_credits} credits per term.")
+        return placement
+
+    def optimize_schedule(self, max_credits, objective="terms", time_budget=5.0, max_terms=None,
+                          term_overrides: dict = None, skip_summer=True, skip_half_terms=True):
+        """
+        Re-plans the remaining courses from the term after the current term with an
+        exact branch-and-bound search (see optimizer.ScheduleOptimizer). With
+        objective="terms" the plan uses as few terms as possible under the credit
+        cap; with objective="overcap" it keeps within max_terms terms (default: the
+        current plan's length) and overloads as few terms as possible. The search
+        stops after time_budget seconds with the best plan found so far.
+        Returns the ScheduleResult (placement, value, lower bound, optimal).
+        """
+        calendar = self.calendar(skip_summer, skip_half_terms)
+        result = optimize_schedule(
+            self, max_credits, objective=objective, time_budget=time_budget, max_terms=max_terms,
+            term_overrides=term_overrides, calendar=calendar,
+        )
+        status = "optimal" if result.optimal else f"lower bound {result.bound}"
+        print(f"Optimized schedule ({objective}): {result.value} ({status}), last term {result.last_term}.")
+        return result
+
+    def critical_path(self, start_term=None, completed=None, skip_summer=True, skip_half_terms=True):
+        """
+        Critical-path analysis of the courses this student still has to take.
+        start_term defaults to the term after the current term. completed defaults to
+        the completed courses plus those planned before start_term (in progress);
+        their requirements count as met. Courses with a typical semester are only
+        placed in terms of that season. Returns a dictionary with the
+        "graduation_term" (earliest possible, ignoring credit limits), the "path" of
+        course names that determines it, and per-course "earliest" / "latest" terms
+        and "slack" (in terms). Memoized per plan version, curriculum version and arguments.
+        """
+        calendar = self.calendar(skip_summer, skip_half_terms)
+        start_term = Term.parse(start_term) if start_term is not None else calendar.next(self.term_now)
+        key = ("critical_path", start_term, frozenset(completed) if completed is not None else None, calendar.seasons)
+
+        def build():
+            terms = self._state.terms
+            done = completed
+            if done is None:
+                done = set(self._state.completed)
+                done.update(name for name, term in terms.items() if term < start_term)
+            graph = self.curriculum.graph
+            remaining = frozenset(
+                i for i, name in enumerate(graph.names)
+                if terms.get(name) is not None and name not in done
+            )
+            names = graph.names
+            term_seasons = tuple(calendar.advance(start_term, k).season for k in range(len(calendar.seasons)))
+            typical = {i: self.get_course(names[i]).typical_semester for i in remaining}
+            result = critical_path(graph, include=remaining, term_seasons=term_seasons, typical=typical)
+            return {
+                "graduation_term": calendar.advance(start_term, result["length"] - 1) if result["length"] else None,
+                "path": [names[i] for i in result["path"]],
+                "courses": {
+                    names[i]: {
+                        "earliest": calendar.advance(start_term, result["earliest"][i]),
+                        "latest": calendar.advance(start_term, result["latest"][i]),
+                        "slack": result["slack"][i],
+                    }
+                    for i in result["earliest"]
+                },
+            }
+        return self._memoized(key, build)
+
+    def earliest_graduation_term(self, start_term=None, completed=None, skip_summer=True, skip_half_terms=True):
+        """
+        Returns the earliest term in which the student could finish all remaining
+        courses if only dependencies (not credit loads) limited the schedule.
+        Returns None if nothing remains. See critical_path for the arguments.
+        """
+        return self.critical_path(start_term, completed, skip_summer, skip_half_terms)["graduation_term"]
+
+    def failure_impact(self, course_names, skip_summer=True, skip_half_terms=True):
+        """
+        Estimates the effect of failing or dropping one or more courses (a name or a
+        list of names) without changing the plan: the retake terms, the downstream
+        courses that slip (old term, new term, number of terms) and the new
+        graduation term. Only the courses that depend on the failed ones are
+        rescheduled (see scheduler.failure_impact).
+        """
+        if isinstance(course_names, str):
+            course_names = [course_names]
+        return failure_impact(self, course_names, calendar=self.calendar(skip_summer, skip_half_terms))
+
+    def _is_done(self, course_name, include_in_progress):
+        if course_name in self._state.completed:
+            return True
+        term = self._state.terms.get(course_name)
+        return include_in_progress and term is not None and term <= self.term_now
+
+    def _eligibility_counters(self, include_in_progress=True):
+        graph = self.curriculum.graph
+        counters = self._eligibility.get(include_in_progress)
+        if counters is None or counters.graph is not graph:
+            done = [self._is_done(name, include_in_progress) for name in graph.names]
+            counters = self._eligibility[include_in_progress] = EligibilityCounters(graph, done)
+        return counters
+
+    def _update_eligibility(self, course_name):
+        for include_in_progress, counters in self._eligibility.items():
+            i = counters.graph.index.get(course_name)
+            if i is not None:
+                counters.set_done(i, self._is_done(course_name, include_in_progress))
+
+    def eligible_courses(self, term=None, include_in_progress=True, planned_only=True, respect_typical_semester=True):
+        """
+        Returns the names of the courses the student is eligible to take in `term`
+        (default: the term after the current term): not completed, all prerequisites
+        completed (or in progress this term, if include_in_progress), and every
+        corequisite/coprerequisite either done or eligible too (taken together).
+        planned_only limits the answer to courses in the plan; with
+        respect_typical_semester, courses typically offered in another semester
+        are left out. Unmet-requirement counters are kept per course and updated
+        as courses are completed or moved, so repeated queries are cheap.
+        """
+        graph = self.curriculum.graph
+        term = Term.parse(term) if term is not None else self.calendar().next(self.term_now)
+        counters = self._eligibility_counters(include_in_progress)
+        terms = self._state.terms
+        eligible = []
+        for i in sorted(counters.frontier()):
+            name = graph.names[i]
+            if planned_only and terms.get(name) is None:
+                continue
+            if respect_typical_semester:
+                typical = self.curriculum.courses[name].typical_semester
+                if typical is not None and typical != term.season:
+                    continue
+            eligible.append(name)
+        return eligible
+
     def enforce_coprerequisites(self):
         """
         Moves courses with unmet coprerequisites forward to the term of its coprerequisite with the latest term.
-        Iteratively moves courses forward until all coprerequisites are satisfied.
-        If a coprerequisite does not yet have a term, it will be assigned to the term of the course.
-        """
-        is_unmet = True
-        while is_unmet:
-            is_unmet = False
-            for course_name, course in self.curriculum.courses.items():
-                print(f"Checking coprerequisites for course {course_name}.")
-                if not course.completed:
-                    unmet_coprereqs = self.get_unmet_coprerequisites_in_term(course_name)
-                    if unmet_coprereqs:
-                        is_unmet = True
-                        # Move the course to the term of the coprerequisite with the latest FUTURE term
-                        latest_term = None
-                        for copreq in unmet_coprereqs:
-                            copreq_course = self.curriculum.courses.get(copreq)
-                            if copreq_course and (latest_term is None or self.is_term_earlier(copreq_course.term, latest_term, equal=True)):
-                                latest_term = copreq_course.term
-                        if latest_term:
-                            print(f"  Moving {course_name} to the term of its latest coprerequisite: {latest_term}.")
-                            year, semester = self.extract_year_and_semester(latest_term)
-                            self.set_course_term(course_name, year, semester)
+        All relation types are enforced together (see enforce_dependencies) so that separate passes cannot undo each other.
+        """
+        return self.enforce_dependencies()
     
     def get_unmet_coprerequisites_in_term(self, course_name, term=None):
         """
         Returns a list of coprerequisites for a given course that will not be met by the term in which the course is planned.
+        Coprerequisites without a term are ignored.
         """
-        course = self.curriculum.courses.get(course_name)
-        if not course:
+        graph = self.curriculum.graph
+        i = graph.index.get(course_name)
+        if i is None:
+            return []
+        terms = self._state.terms
+        course_term = term if term is not None else terms.get(course_name)  # Use the provided term or the course's term
+        if course_term is None:
             return []
-        course_term = term if term is not None else course.term  # Use the provided term or the course's term
         unmet_coprereqs = []
-        for copreq in course.coprereqs:
-            copreq_course = self.curriculum.courses.get(copreq)
-            copreq_term = copreq_course.term
-            if copreq_course and not self.is_term_earlier(term=copreq_term, than=course_term, equal=True):
+        for j in graph.reverse["coprereq"][i]:
+            copreq = graph.names[j]
+            copreq_term = terms.get(copreq)
+            if copreq_term is not None and not self.is_term_earlier(term=copreq_term, than=course_term, equal=True):
                 unmet_coprereqs.append(copreq)
         print(f"  Unmet coprerequisites for {course_name} in term {course_term}: {unmet_coprereqs}")
         return unmet_coprereqs
     
     def enforce_corequisites(self):
         """
-        Moves courses with unmet corequisites forward to the term of its corequisite with the latest term.
-        Iteratively moves courses forward until all corequisites are satisfied.
-        If a corequisite does not yet have a term, it will be assigned to the term of the course.
+        Moves courses with unmet corequisites forward so that each corequisite group shares the latest term of its members.
+        All relation types are enforced together (see enforce_dependencies) so that separate passes cannot undo each other.
         """
-        is_unmet = True
-        while is_unmet:
-            is_unmet = False
-            for course_name, course in self.curriculum.courses.items():
-                print(f"Checking corequisites for course {course_name}.")
-                if not course.completed:
-                    unmet_coreqs = self.get_unmet_corequisites_in_term(course_name)
-                    if unmet_coreqs:
-                        is_unmet = True
-                        # Move the course to the term of the corequisite with the latest FUTURE term
-                        latest_term = None
-                        for coreq in unmet_coreqs:
-                            coreq_course = self.curriculum.courses.get(coreq)
-                            if coreq_course and (latest_term is None or self.is_term_earlier(coreq_course.term, latest_term, equal=True)):
-                                latest_term = coreq_course.term
-                        if latest_term:
-                            print(f"  Moving {course_name} to the term of its latest corequisite: {latest_term}.")
-                            year, semester = self.extract_year_and_semester(latest_term)
-                            self.set_course_term(course_name, year, semester)
+        return self.enforce_dependencies()
 
     def get_unmet_corequisites_in_term(self, course_name, term=None):
         """
         Returns a list of corequisites for a given course that will not be met by the term in which the course is planned.
+        Corequisites without a term are ignored.
         """
-        course = self.curriculum.courses.get(course_name)
-        if not course:
+        graph = self.curriculum.graph
+        i = graph.index.get(course_name)
+        if i is None:
+            return []
+        terms = self._state.terms
+        course_term = term if term is not None else terms.get(course_name)  # Use the provided term or the course's term
+        if course_term is None:
             return []
-        course_term = term if term is not None else course.term  # Use the provided term or the course's term
         unmet_coreqs = []
-        for coreq in course.coreqs:
-            coreq_course = self.curriculum.courses.get(coreq)
-            coreq_term = coreq_course.term
-            if coreq_course and not self.is_term_earlier(term=coreq_term, than=course_term, equal=True):
+        for j in graph.reverse["coreq"][i]:
+            coreq = graph.names[j]
+            coreq_term = terms.get(coreq)
+            if coreq_term is not None and not self.is_term_earlier(term=coreq_term, than=course_term, equal=True):
                 unmet_coreqs.append(coreq)
         print(f"  Unmet corequisites for {course_name} in term {course_term}: {unmet_coreqs}")
         return unmet_coreqs
                     
     def enforce_prerequisites(self):
         """
-        Moves courses with unmet prerequisites to terms in which they can be taken.
-        Iteratively moves courses forward until all prerequisites are satisfied.
+        Moves courses with unmet prerequisites to the earliest terms in which they can be taken.
+        All relation types are enforced together (see enforce_dependencies) so that separate passes cannot undo each other.
         """
-        # Check all courses for unmet prerequisites
-        is_unmet = True
-        while is_unmet:
-            is_unmet = False
-            for course_name, course in self.curriculum.courses.items():
-                print(f"Checking prerequisites for course {course_name}.")
-                if not course.completed:
-                    unmet_prereqs = self.get_unmet_prerequisites_in_term(course_name)
-                    if unmet_prereqs:
-                        is_unmet = True
-                        # Move the course to the term after the term it was in
-                        current_term = course.term
-                        if current_term:
-                            next_term = self.get_term_after(current_term)
-                            year, semester = self.extract_year_and_semester(next_term)
-                            self.set_course_term(course_name, year, semester)
-                            print(f"Moved {course_name} to {next_term} due to unmet prerequisites.")
+        return self.enforce_dependencies()
 
     def extract_year_and_semester(self, term_label):
         """
-        Extracts the year and semester from a term label like '2025-F' or '2024-S'.
+        Extracts the year and semester from a term (or a label like '2025-F' or '2024-S').
         Returns a tuple (year, semester).
         """
-        match = re.match(r"(\d{4})-(\w+)", term_label)
-        if match:
-            year = int(match.group(1))
-            semester = match.group(2)
-            return year, semester
-        else:
-            raise ValueError(f"Invalid term label format: {term_label}")
+        term = Term.parse(term_label)
+        return term.year, term.season
         
     def get_unmet_prerequisites_in_term(self, course_name, term=None):
         """
         Returns a list of prerequisites for a given course that will not be met by the term in which the course is planned.
+        Prerequisites without a term are ignored.
         """
-        course = self.curriculum.courses.get(course_name)
-        if not course:
+        graph = self.curriculum.graph
+        i = graph.index.get(course_name)
+        if i is None:
+            return []
+        terms = self._state.terms
+        course_term = term if term is not None else terms.get(course_name)  # Use the provided term or the course's term
+        if course_term is None:
             return []
-        course_term = term if term is not None else course.term  # Use the provided term or the course's term
         unmet_prereqs = []
-        for prereq in course.prereqs:
-            print(f"Checking prerequisite {prereq} for course {course_name}.")
-            prereq_course = self.curriculum.courses.get(prereq)
-            prereq_term = prereq_course.term
-            print(f"  Is {prereq_term} older than {course_term}?")
-            if prereq_course and not self.is_term_earlier(term=prereq_term, than=course_term, equal=False):
-                print(f"  {prereq} is not met for {course_name} in term {course_term}.")
+        for j in graph.reverse["prereq"][i]:
+            prereq = graph.names[j]
+            prereq_term = terms.get(prereq)
+            if prereq_term is not None and not self.is_term_earlier(term=prereq_term, than=course_term, equal=False):
                 unmet_prereqs.append(prereq)
-            else:
-                print(f"  {prereq} is met for {course_name} in term {course_term}.")
         print(f"  Unmet prerequisites for {course_name} in term {course_term}: {unmet_prereqs}")
         return unmet_prereqs
     
@@ -315,18 +423,8 @@ class StudentPlan(GenericPlan):
         Checks if the given term is older than the specified term.
         If equal is True, it also considers terms that are the same as older.
         """
-        term_year, term_semester = self.extract_year_and_semester(term)
-        than_year, than_semester = self.extract_year_and_semester(than)
-        
-        if term_year < than_year:
-            return True
-        elif term_year == than_year:
-            semester_order = ["S", "Su", "Su1", "Su2", "F"]
-            if semester_order.index(term_semester) < semester_order.index(than_semester):
-                return True
-            elif equal and semester_order.index(term_semester) == semester_order.index(than_semester):
-                return True
-        return False
+        term, than = Term.parse(term), Term.parse(than)
+        return term <= than if equal else term < than
 
     def compress_schedule(self, only_constrained=True):
         """
@@ -334,40 +432,38 @@ class StudentPlan(GenericPlan):
         This is useful for optimizing the course load and ensuring prerequisites are met.
         """
         print("Compressing schedule by moving courses to the earliest possible term.")
-        for course_name, course in self.curriculum.courses.items():
+        next_term = self.calendar().next(self.get_term_now())
+        for course_name, course in self.course_items():
             if not course.completed:
                 current_term = course.term
                 if current_term:
                     # Move everything (or everything constrained) to next semester (this will violate pre, co, and coprerequisites)
-                    next_term = self.get_term_after(self.get_term_now())
                     if self.is_term_earlier(next_term, than=current_term, equal=False):
                         if only_constrained:
                             if (course.prereqs or course.coreqs or course.coprereqs):
-                                self.set_course_term(course_name, *self.extract_year_and_semester(next_term))
+                                self.set_course_term(course_name, term=next_term)
                         else:
-                            self.set_course_term(course_name, *self.extract_year_and_semester(next_term))
+                            self.set_course_term(course_name, term=next_term)
         # Now we need to enforce prerequisites, coprerequisites, and corequisites
-        self.enforce_prerequisites()
-        self.enforce_coprerequisites()
-        self.enforce_corequisites()
+        self.enforce_dependencies()
 
-    def set_course_term(self, course_name: str, year: int = None, semester: str = None, term: str = None):
+    def set_course_term(self, course_name: str, year: int = None, semester: str = None, term=None):
         """
-        Assigns a specific normalized term label like '2025-F' to the course.
-        Term has to be provided as a string like '2025-F' to term argument or
+        Assigns a specific term like '2025-F' to the course.
+        Term has to be provided as a Term or string like '2025-F' to term argument or
         as separate year and semester arguments.
         """
-        if term:
-            year, semester = self.extract_year_and_semester(term)
-        term_label = self._normalize_term_label(year, semester)
-        self.courses_by_term()[course_name] = term_label
-        self.set_term(course_name, term_label)
+        if term is not None:
+            term = Term.parse(term)
+        else:
+            term = self._normalize_term_label(year, semester)
+        self.set_term(course_name, term)
 
     def get_course_term(self, course_name: str):
         """
         Retrieves the term assignment for a course.
         """
-        return self.courses[course_name].term if course_name in self.courses else None
+        return self.get_term(course_name)
     
     def bump_course_term(self, course_name: str, skip_summer=True, skip_half_terms=True, reverse=False):
         """
@@ -375,17 +471,18 @@ class StudentPlan(GenericPlan):
         If reverse is True, it moves to the previous term instead.
         If skip_summer is True, it skips summer terms.
         """
-        if course_name not in self.courses:
+        if not self.has_course(course_name):
             raise KeyError(f"Course {course_name} not found in curriculum.")
         
         current_term = self.get_course_term(course_name)
         if current_term is None:
             raise ValueError(f"Course {course_name} does not have a term assigned.")
         
+        calendar = self.calendar(skip_summer=skip_summer, skip_half_terms=skip_half_terms)
         if reverse: # Move to the previous term
-            new_term = self.get_term_before(current_term, skip_summer=skip_summer, skip_half_terms=skip_half_terms)
+            new_term = calendar.previous(current_term)
         else: # Move to the next term
-            new_term = self.get_term_after(current_term, skip_summer=skip_summer, skip_half_terms=skip_half_terms)
+            new_term = calendar.next(current_term)
         self.set_course_term(course_name, term=new_term)
 
     def bump_to_typical_term(self, course_name: str):
@@ -393,10 +490,10 @@ class StudentPlan(GenericPlan):
         Moves the course to the typical term for its type.
         For example, if the course is typically taken in Fall, it will be moved to the next Fall term.
         """
-        if course_name not in self.curriculum.courses:
+        if not self.has_course(course_name):
             raise KeyError(f"Course {course_name} not found in curriculum.")
         
-        course = self.curriculum.courses[course_name]
+        course = self.get_course(course_name)
 
         if course.term is None:
             raise ValueError(f"Course {course_name} does not have a term assigned.")
@@ -411,16 +508,11 @@ class StudentPlan(GenericPlan):
             print(f"No typical semester defined for {course_name}, cannot bump.")
             return course.term
         else:
-            current_semester = self.extract_year_and_semester(course.term)[1]
+            current_semester = course.term.season
             if typical_semester != current_semester:
                 # Move to the next occurrence of the typical semester
-                # Iterate through the terms until we find the next occurrence of the typical semester
-                while True:
-                    next_term = self.get_term_after(course.term, skip_summer=True, skip_half_terms=True)
-                    next_year, next_semester = self.extract_year_and_semester(next_term)
-                    course.term = next_term
-                    if next_semester == typical_semester:
-                        break
+                next_term = self.calendar().next_occurrence(course.term, typical_semester)
+                self.set_term(course_name, next_term)
         print(f"Bumping {course_name} from {current_semester} to its typical term: {course.term}.")
         return course.term
     
@@ -430,7 +522,7 @@ class StudentPlan(GenericPlan):
         This is useful for ensuring that courses are scheduled in the semesters they are typically offered.
         """
         print("Bumping all courses to their typical terms.")
-        for course_name in self.curriculum.courses:
+        for course_name in self.course_names:
             try:
                 self.bump_to_typical_term(course_name)
             except ValueError as e:
@@ -440,57 +532,18 @@ class StudentPlan(GenericPlan):
         """
         Removes the term assignment for a course, effectively removing it from the plan.
         """
-        self.courses_by_term().pop(course_name, None)
-        if course_name in self.curriculum.courses:
-            self.curriculum.courses[course_name].term = None
+        if self.has_course(course_name):
+            self.set_term(course_name, None)
         else:
             print(f"Course {course_name} not found in curriculum, cannot remove term assignment.")
 
     def _normalize_term_label(self, year, semester):
         """
-        Normalize year and semester into a term label like '2025-F'.
+        Normalize year and semester into a Term (displayed like '2025-F').
         Accepts 2- or 4-digit years and maps full season names to abbreviations.
         """
-        if isinstance(year, int):
-            if year == 0:
-                year = "0000"  # Special case for transfer terms
-            else:
-                if year < 100:  # Handle 2-digit years
-                    year += 2000
-                year = str(year)
-        elif isinstance(year, str):
-            if year == "0000":
-                year = "0000"
-            else:
-                if len(year) == 2 and year.isdigit():
-                    year = "20" + year
-                elif not year.isdigit() or len(year) not in [2, 4]:
-                    raise ValueError(f"Invalid year format: {year}")
-        else:
-            raise TypeError("Year must be int or string")
-
-        season_map = {
-            "F": "F", "Fall": "F",
-            "S": "S", "Spring": "S",
-            "Su": "Su", "Summer": "Su",
-            "Su1": "Su1", "Summer1": "Su1",
-            "Su2": "Su2", "Summer2": "Su2",
-            "Transfer": "Transfer"
-        }
-
-        sem = season_map.get(semester)
-        if sem is None:
-            raise ValueError(f"Invalid semester/season: {semester}. Must be one of: F, S, Su, Su1, Su2, Transfer.")
+        return Term.from_parts(year, semester)
 
-        return f"{year}-{sem}"
-
-    def mark_completed(self, course_name: str):
-        """
-        Marks a course as completed.
-        """
-        course = self.curriculum.courses[course_name]
-        if course:
-            course.set_completed(True)
     def _assign_specific_terms(self):
         """
         Converts generic plan term labels like '1F', '2S', etc. into
@@ -498,18 +551,17 @@ class StudentPlan(GenericPlan):
         Only considers S and F terms in a yearly cycle.
         """
         term_order = ["S", "F"]
-        start_index = term_order.index(self._normalize_term_label(self.start_year, self.start_semester).split("-")[1])
-        generic_terms = sorted(t for t in self.courses_by_term().keys() if t is not None)
+        start_index = term_order.index(self._normalize_term_label(self.start_year, self.start_semester).season)
+        courses_by_term = self.courses_by_term()  # Snapshot of the generic layout; set_term below changes the plan
+        generic_terms = sorted(t for t in courses_by_term.keys() if t is not None)
 
         year = self.start_year
         season_index = start_index
         for generic_term in generic_terms:
-            actual_term = f"{year}-{term_order[season_index]}"
-            for course in self.courses_by_term()[generic_term]:
+            actual_term = Term.from_parts(year, term_order[season_index])
+            for course in courses_by_term[generic_term]:
                 course_name = course.name
                 self.set_term(course_name, actual_term)
-                if course_name in self.curriculum.courses:
-                    self.curriculum.courses[course_name].term = actual_term
             season_index += 1
             if season_index >= len(term_order):
                 season_index = 0
@@ -531,120 +583,83 @@ class StudentPlan(GenericPlan):
     def parse_html_transcript(self, file_path: str):
         """
         Parses an HTML transcript file and extracts course information.
+        The file is read once as a stream (see transcript.iter_transcript_records).
         :param file_path: Path to the HTML transcript file.
         """
-        from bs4 import BeautifulSoup
-        with open(file_path, 'r', encoding='utf-8') as file:
-            soup = BeautifulSoup(file, 'html.parser')
-
-        rows = soup.find_all("tr")
-
-        current_term = None
-
-        for row in rows:
-            # Find the current term from the previous h2 tag
-            h2_tag = row.find_previous("h2")
-            if h2_tag is not None:
-                current_term = h2_tag.get_text(strip=True)
-
-            cells = row.find_all("td")
-            if len(cells) >= 6:
-                course_name = cells[0].get_text(strip=True)
-                title = cells[1].get_text(strip=True)
-                letter_grade = cells[3].get_text(strip=True)
-                credits = cells[4].get_text(strip=True)
-                quality_points = cells[5].get_text(strip=True)
-
-                # Filter: If credits and quality points don't parse to floats, discard the row
-                if not (credits.replace('.', '', 1).isdigit() and quality_points.replace('.', '', 1).isdigit()):
-                    continue
-
-                # Filter: If course name contains ["TERM", "OVERALL"], discard the row
-                if any(term.lower() in course_name.lower() for term in ["TERM", "OVERALL"]):
-                    continue
-
-                # Normalize course name (some transcripts may have variations like "COR100" instead of "COR 100" or "ME100" instead of "ME 100"). We may need to split after the letters prefix.
-                course_name = re.sub(r'(\D+)(\d+)', r'\1 \2', course_name)  # Add space between letters and numbers
-                course_name = re.sub(r'\s+', ' ', course_name)  # Normalize multiple spaces
-                course_name = course_name.strip().upper()
-                # If it ends with a letter, and that letter isn't a W or L, strip it
-                if course_name[-1].isalpha() and course_name[-1] != 'W' and course_name[-1] != 'L':
-                    course_name = course_name[:-1]
-                if course_name in self.curriculum.courses:
-                    course = self.curriculum.courses[course_name]
-                else:
-                    # Check if it's actually a DTA, not a course at all
-                    if "AA-DTA" in course_name:
-                        self.DTA = "AA-DTA"
-                        print(f"  Detected DTA: {self.DTA}")
-                        continue
-                    if "AS-DTA" in course_name:
-                        self.DTA = "AS-DTA"
-                        print(f"  Detected DTA: {self.DTA}")
-                        continue
-                    # Add course with category Other
-                    self.curriculum.course(course_name, credits=float(credits) if credits else 0.0, categories=["O"])
-                    course = self.curriculum.courses[course_name]
-                course.letter_grade = letter_grade
-                course.grade = float(quality_points) / float(credits) if float(credits) > 0 else 0
-                course.title = title
-                course.credits = int(float(credits)) if credits else 0
-                course.quality_points = float(quality_points) if quality_points else 0.0
-                if course.letter_grade not in ["F", "", "W", "IP", "AU", "I", "NC"]:
-                    print(f"  Marking course {course_name} as completed.")
-                    course.set_completed(True)
-
-                if current_term:
-                    # Attempt to parse year and semester from current_term
-                    # Expecting something like "2023 Fall" or "2024 Spring" or "0000 Transfer" 
-                    match = re.match(r"(\d{4})\s*(Fall|Spring|Summer|Su1|Su2|Su|Transfer)", current_term, re.IGNORECASE)
-                    print(f"  Current term match parts: {match.groups() if match else None}")
-                    if match:
-                        # Handle transfer terms. Change the start_year to 0000
-                        # if match.group(2).lower() == "transfer":
-                            # self.start_year = 0
-                            # self.start_semester = "Transfer"
-                        year_raw = match.group(1)
-                        semester_raw = match.group(2)
-                        print(f"  Setting term for {course_name} to semester {semester_raw} of year {year_raw}.")
-                        try:
-                            term_label = self._normalize_term_label(year_raw, semester_raw)
-                            self.courses_by_term()[course_name] = term_label
-                            self.set_term(course_name, term_label)
-                        except Exception as e:
-                            print(f"  Error setting term for {course_name}: {e}")
-                            pass
+        for record in iter_transcript_records(file_path):
+            self.apply_transcript_record(record)
         self.move_unfinished_courses_forward()  # Move unfinished courses to the next term after the current term
-        self.enforce_prerequisites()  # Ensure all courses have their prerequisites satisfied
-        self.enforce_coprerequisites()  # Ensure all courses have their coprerequisites satisfied
-        self.enforce_corequisites()  # Ensure all courses have their corequisites satisfied
+        self.enforce_dependencies()  # Ensure all prerequisites, coprerequisites and corequisites are satisfied
         self.replace_generic_courses()  # Replace generic courses with specific courses if they are planned or completed
+
+    def apply_transcript_record(self, record: dict):
+        """
+        Records one transcript course record (see transcript.iter_transcript_records)
+        in the plan: grade, credits, completion and term. Courses that are not in
+        the curriculum are added to this plan with category Other, and DTA rows
+        set the plan's DTA. Codes are matched with the curriculum's
+        CourseCodeNormalizer (aliases, W variants, DTA markers).
+        """
+        codes = course_code_normalizer(self.curriculum)
+        course_name = codes.normalize(record["code"])
+        credits = record["credits"]
+        quality_points = record["quality_points"]
+        if self.has_course(course_name):
+            course = self.get_course(course_name)
+        else:
+            # Check if it's actually a DTA, not a course at all
+            dta = codes.dta(record["code"])
+            if dta:
+                self.DTA = dta
+                print(f"  Detected DTA: {self.DTA}")
+                return
+            # Add course with category Other (known to this plan only; the curriculum is shared)
+            course = self.add_local_course(course_name, credits=credits, categories=["O"])
+        self.update_record(
+            course_name,
+            letter_grade=record["letter_grade"],
+            grade=quality_points / credits if credits > 0 else 0,
+            title=record["title"],
+            credits=int(credits),
+            quality_points=quality_points,
+        )
+        if course.letter_grade not in ["F", "", "W", "IP", "AU", "I", "NC"]:
+            print(f"  Marking course {course_name} as completed.")
+            course.set_completed(True)
+
+        if record["term"]:
+            # Expecting something like "2023 Fall" or "2024 Spring" or "0000 Transfer"
+            print(f"  Current term match parts: {(record['year'], record['semester']) if record['year'] else None}")
+            if record["year"]:
+                print(f"  Setting term for {course_name} to semester {record['semester']} of year {record['year']}.")
+                try:
+                    term = self._normalize_term_label(record["year"], record["semester"])
+                    self.set_term(course_name, term)
+                except Exception as e:
+                    print(f"  Error setting term for {course_name}: {e}")
     
     def replace_generic_courses(self):
         """
-        Replaces each course in the plan that has a nonempty generic_for attribute with a specific course if it is planned (or completed).
-        """
-        for course_name, course in self.curriculum.courses.items():
-            if course.generic_for:
-                # This is a generic course that can be replaced with a specific course
-                # See if any of the courses in generic_for are planned
-                planned_courses = [course.name for course in self.courses]
-                for for_course in course.generic_for:
-                    if for_course in planned_courses:
-                        # Replace the generic with the specific course
-                        # Remove the generic course from the plan
-                        self.remove_course_term(course.name)
-                        break
-    
+        Replaces placeholder courses (those with a nonempty generic_for attribute)
+        with the specific courses that are planned (or completed). Each specific
+        course fills at most one placeholder, and as many placeholders as possible
+        are filled (bipartite matching, see electives.assign_electives). Filled
+        placeholders are removed from the plan; unfilled ones are reported.
+        Returns the assignment dictionary.
+        """
+        assignment = assign_electives(self)
+        for slot, course_name in assignment["assigned"].items():
+            if self.get_term(slot) is not None:
+                self.remove_course_term(slot)
+                print(f"Replaced {slot} with {course_name}.")
+        unfilled = [slot for slot in assignment["unfilled"] if self.get_term(slot) is not None]
+        if unfilled:
+            print(f"Placeholders still to be filled: {', '.join(unfilled)}.")
+        return assignment
+
     def last_term(self):
         """
-        Returns the last term in the plan.
+        Returns the last term in the plan (no earlier than the start term).
         """
-        last_term = self._normalize_term_label(self.start_year, self.start_semester)
-        for course_name, course in self.curriculum.courses.items():
-            if course.term is not None:
-                print(f"IS {course_name} in the last term? Is {course.term} later than {last_term}? ", end="")
-                if not self.is_term_earlier(course.term, last_term, equal=True):
-                    last_term = course.term
-                    print(f" ... YES!")
-        return last_term
\ No newline at end of file
+        start_term = self._normalize_term_label(self.start_year, self.start_semester)
+        return max(start_term, max(self._state.terms.values(), default=start_term))
@@ -0,0 +1,285 @@
+# terms.py
+
+import re
+
+# Season slots within a calendar year, in chronological order. Transfer only occurs in year 0000.
+SEASONS = ("Transfer", "S", "Su", "Su1", "Su2", "F")
+SEASON_INDEX = {season: i for i, season in enumerate(SEASONS)}
+SEASONS_PER_YEAR = len(SEASONS)
+
+SEASON_ALIASES = {
+    "f": "F", "fall": "F",
+    "s": "S", "spring": "S",
+    "su": "Su", "summer": "Su",
+    "su1": "Su1", "summer1": "Su1",
+    "su2": "Su2", "summer2": "Su2",
+    "transfer": "Transfer",
+}
+
+_TERM_PATTERN = re.compile(r"^\s*(\d{1,4})\s*-?\s*([A-Za-z]+\d?)\s*$")
+
+
+def normalize_season(semester):
+    """
+    Maps a season name or abbreviation ('Fall', 'F', 'Summer1', ...) to its abbreviation.
+    """
+    season = SEASON_ALIASES.get(str(semester).lower())
+    if season is None:
+        raise ValueError(f"Invalid semester/season: {semester}. Must be one of: F, S, Su, Su1, Su2, Transfer.")
+    return season
+
+
+class Term(int):
+    """
+    An academic term backed by a single integer ordinal (year * 6 + season slot),
+    so comparisons, hashing and stepping are plain integer operations.
+
+    Calendar terms look like '2025-F'; '0000-Transfer' sorts before every other term.
+    Generic plan terms like '1F' and '1S' (academic year 1, fall then spring) are
+    also supported: academic year N's fall is stored in year N and its spring in
+    year N + 1, so generic terms sort in plan order. Strings are produced only by
+    str() / label for display and DOT output.
+    """
+
+    __slots__ = ()
+
+    _cache = {}  # label -> Term
+
+    def __new__(cls, value):
+        if isinstance(value, str):
+            return cls.parse(value)
+        return int.__new__(cls, value)
+
+    @classmethod
+    def from_parts(cls, year, semester):
+        """
+        Builds a term from a year (int or str, 2 or 4 digits; 0 for transfer) and a
+        semester name or abbreviation.
+        """
+        if isinstance(year, str):
+            if not year.isdigit() or len(year) not in [2, 4]:
+                raise ValueError(f"Invalid year format: {year}")
+            year = int(year)
+        elif not isinstance(year, int):
+            raise TypeError("Year must be int or string")
+        if 0 < year < 100:  # Handle 2-digit years
+            year += 2000
+        season = normalize_season(semester)
+        return int.__new__(cls, year * SEASONS_PER_YEAR + SEASON_INDEX[season])
+
+    @classmethod
+    def parse(cls, label):
+        """
+        Parses a term label like '2025-F', '25-Fall', '0000-Transfer' or a generic '2S'.
+        Terms are returned unchanged. Raises ValueError for unrecognized labels.
+        """
+        if isinstance(label, Term):
+            return label
+        term = cls._cache.get(label)
+        if term is not None:
+            return term
+        if not isinstance(label, str):
+            raise ValueError(f"Invalid term label format: {label}")
+        match = _TERM_PATTERN.match(label)
+        if not match:
+            raise ValueError(f"Invalid term label format: {label}")
+        year_raw, semester = match.groups()
+        if len(year_raw) in (1, 2) and "-" not in label:
+            # Generic plan term: academic year N, fall in year N, spring/summer in year N + 1
+            academic_year = int(year_raw)
+            season = normalize_season(semester)
+            year = academic_year if season == "F" else academic_year + 1
+            term = int.__new__(cls, year * SEASONS_PER_YEAR + SEASON_INDEX[season])
+        else:
+            if len(year_raw) not in (2, 4):
+                raise ValueError(f"Invalid term label format: {label}")
+            term = cls.from_parts(year_raw, semester)
+        cls._cache[label] = term
+        return term
+
+    @property
+    def year(self):
+        return int(self) // SEASONS_PER_YEAR
+
+    @property
+    def season(self):
+        return SEASONS[int(self) % SEASONS_PER_YEAR]
+
+    @property
+    def is_transfer(self):
+        return self.season == "Transfer"
+
+    @property
+    def is_summer(self):
+        return self.season.startswith("Su")
+
+    @property
+    def is_generic(self):
+        return 0 < self.year < 1000
+
+    @property
+    def label(self):
+        year, season = self.year, self.season
+        if self.is_generic:
+            return f"{year if season == 'F' else year - 1}{season}"
+        return f"{year:04d}-{season}"
+
+    def __bool__(self):
+        return True  # '0000-Transfer' has ordinal 0 but is still a term
+
+    def __str__(self):
+        return self.label
+
+    def __format__(self, spec):
+        return format(self.label, spec)
+
+    def __repr__(self):
+        return f"Term('{self.label}')"
+
+
+def as_term(term):
+    """
+    Returns term as a Term (parsing strings), or None if term is None.
+    """
+    if term is None:
+        return None
+    return Term.parse(term)
+
+
+def policy_seasons(skip_summer=True, skip_half_terms=True):
+    """
+    Returns the seasons a term sequence visits under the given skip policy.
+    """
+    if skip_summer:
+        return ("S", "F")
+    if skip_half_terms:
+        return ("S", "Su", "F")
+    return ("S", "Su", "Su1", "Su2", "F")
+
+
+class TermCalendar:
+    """
+    Precomputed sequence of terms for one skip policy over a planning horizon.
+    Answers next/previous term, n-th term after, next occurrence of a season and
+    the distance between terms in constant time using prefix counts over term
+    ordinals. Terms outside the horizon (e.g., '0000-Transfer' or generic terms)
+    fall back to stepping, which visits at most one year of slots.
+    Use TermCalendar.for_policy() to share one calendar per policy.
+    """
+
+    _calendars = {}  # (seasons, first_year, last_year) -> TermCalendar
+
+    def __init__(self, skip_summer=True, skip_half_terms=True, first_year=1900, last_year=2200):
+        self.seasons = policy_seasons(skip_summer, skip_half_terms)
+        self.first_year = first_year
+        self.last_year = last_year
+        self._base = first_year * SEASONS_PER_YEAR
+        self._end = (last_year + 1) * SEASONS_PER_YEAR
+        slots = {SEASON_INDEX[season] for season in self.seasons}
+        self._sequence = [o for o in range(self._base, self._end) if o % SEASONS_PER_YEAR in slots]
+        # _le[o - base]: number of policy terms <= o; _lt[o - base]: number of policy terms < o
+        self._le = []
+        self._lt = []
+        count = 0
+        for o in range(self._base, self._end):
+            self._lt.append(count)
+            if o % SEASONS_PER_YEAR in slots:
+                count += 1
+            self._le.append(count)
+
+    @classmethod
+    def for_policy(cls, skip_summer=True, skip_half_terms=True):
+        """
+        Returns the shared calendar for a skip policy.
+        """
+        key = policy_seasons(skip_summer, skip_half_terms)
+        calendar = cls._calendars.get(key)
+        if calendar is None:
+            calendar = cls._calendars[key] = cls(skip_summer, skip_half_terms)
+        return calendar
+
+    def _in_horizon(self, *ordinals):
+        return all(self._base <= o < self._end for o in ordinals)
+
+    def _step(self, ordinal, direction):
+        ordinal += direction
+        while SEASONS[ordinal % SEASONS_PER_YEAR] not in self.seasons:
+            ordinal += direction
+        return Term(ordinal)
+
+    def __contains__(self, term):
+        return Term.parse(term).season in self.seasons
+
+    def next(self, term):
+        """
+        Returns the first policy term after the given term.
+        """
+        o = Term.parse(term)
+        if self._in_horizon(o):
+            k = self._le[o - self._base]
+            if k < len(self._sequence):
+                return Term(self._sequence[k])
+        return self._step(o, 1)
+
+    def previous(self, term):
+        """
+        Returns the last policy term before the given term.
+        """
+        o = Term.parse(term)
+        if self._in_horizon(o):
+            k = self._lt[o - self._base]
+            if k > 0:
+                return Term(self._sequence[k - 1])
+        return self._step(o, -1)
+
+    def advance(self, term, steps):
+        """
+        Returns the policy term `steps` terms after (or before, if negative) the given term.
+        A term outside the policy (e.g., a summer term when summers are skipped)
+        counts as sitting just before the next policy term.
+        """
+        o = Term.parse(term)
+        if steps == 0:
+            return o
+        if self._in_horizon(o):
+            k = self._le[o - self._base] + steps - 1 if steps > 0 else self._lt[o - self._base] + steps
+            if 0 <= k < len(self._sequence):
+                return Term(self._sequence[k])
+        for _ in range(abs(steps)):
+            o = self._step(o, 1 if steps > 0 else -1)
+        return o
+
+    def next_occurrence(self, term, season, inclusive=False):
+        """
+        Returns the first term after (or at, if inclusive) the given term whose season is `season`.
+        """
+        if season not in self.seasons:
+            raise ValueError(f"Season {season} is not part of this calendar ({', '.join(self.seasons)}).")
+        o = Term.parse(term)
+        year, slot = divmod(int(o), SEASONS_PER_YEAR)
+        target = SEASON_INDEX[season]
+        if slot < target or (inclusive and slot == target):
+            return Term(year * SEASONS_PER_YEAR + target)
+        return Term((year + 1) * SEASONS_PER_YEAR + target)
+
+    def distance(self, start, end):
+        """
+        Returns the number of policy terms after `start` up to and including `end`
+        (negative if `end` is before `start`). For two policy terms this is the
+        number of steps from one to the other.
+        """
+        a, b = Term.parse(start), Term.parse(end)
+        if self._in_horizon(a, b):
+            return self._le[b - self._base] - self._le[a - self._base]
+        sign = 1 if b >= a else -1
+        lo, hi = (a, b) if sign > 0 else (b, a)
+        return sign * sum(1 for o in range(lo + 1, hi + 1) if SEASONS[o % SEASONS_PER_YEAR] in self.seasons)
+
+    def terms_between(self, start, end):
+        """
+        Returns the policy terms after `start` up to and including `end`.
+        """
+        a, b = Term.parse(start), Term.parse(end)
+        if self._in_horizon(a, b):
+            return [Term(o) for o in self._sequence[self._le[a - self._base]:self._le[b - self._base]]]
+        return [Term(o) for o in range(a + 1, b + 1) if SEASONS[o % SEASONS_PER_YEAR] in self.seasons]
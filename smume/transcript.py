@@ -0,0 +1,150 @@
+# transcript.py
+
+import re
+from html.parser import HTMLParser
+
+from smume.course_codes import normalize_course_code
+
+CHUNK_SIZE = 1 << 16  # Characters fed to the parser at a time
+
+TERM_PATTERN = re.compile(r"(\d{4})\s*(Fall|Spring|Summer|Su1|Su2|Su|Transfer)", re.IGNORECASE)
+SKIP_ROW_WORDS = ("term", "overall")  # Summary rows ("TERM TOTALS", "OVERALL") are not courses
+
+
+def _is_number(text):
+    return text.replace('.', '', 1).isdigit()
+
+
+class TranscriptParser(HTMLParser):
+    """
+    Event-driven parser for HTML transcripts. Course rows are table rows with at
+    least six cells (code, title, -, letter grade, credits, quality points); the
+    term of a row is the text of the last <h2> heading before it. Finished
+    records are collected in `records` as the document is fed (see
+    iter_transcript_records); no document tree is built.
+    Cell texts are the cell's stripped text nodes joined together, and cells of
+    nested tables also count as cells of the enclosing rows. A text node is
+    stripped once it ends, so the chunks it was fed in do not matter.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._text = []  # Raw pieces of the current text node, which feed() may report in parts
+        self.term = None
+        self._heading = None  # Text pieces of the <h2> being read
+        self._rows = []  # Open rows: (start position, term, cells)
+        self._cells = []  # Open cells: (number of open rows when opened, text pieces)
+        self._finished = []  # Finished rows of the outermost open row, by start position
+        self._position = 0
+        self.records = []
+
+    def _end_text(self):
+        # A text node ends at the next markup; its text is stripped as a whole
+        text = "".join(self._text).strip()
+        self._text = []
+        if not text:
+            return
+        if self._heading is not None:
+            self._heading.append(text)
+        for _, cell in self._cells:
+            cell.append(text)
+
+    def handle_starttag(self, tag, attrs):
+        self._end_text()
+        if tag == "h2":
+            self._heading = []
+        elif tag == "tr":
+            self._rows.append((self._position, self.term, []))
+            self._position += 1
+        elif tag == "td" and self._rows:
+            cell = []
+            for _, _, cells in self._rows:
+                cells.append(cell)
+            self._cells.append((len(self._rows), cell))
+
+    def handle_endtag(self, tag):
+        self._end_text()
+        if tag == "h2" and self._heading is not None:
+            self.term = "".join(self._heading)
+            self._heading = None
+        elif tag == "td" and self._cells:
+            self._cells.pop()
+        elif tag == "tr" and self._rows:
+            depth = len(self._rows)
+            while self._cells and self._cells[-1][0] >= depth:
+                self._cells.pop()  # Cells left open in this row
+            self._finished.append(self._rows.pop())
+            if not self._rows:
+                self._finished.sort(key=lambda row: row[0])
+                for _, term, cells in self._finished:
+                    record = self._record(term, ["".join(cell) for cell in cells])
+                    if record is not None:
+                        self.records.append(record)
+                self._finished = []
+
+    def handle_data(self, data):
+        self._text.append(data)
+
+    def handle_comment(self, data):
+        self._end_text()
+
+    def handle_decl(self, decl):
+        self._end_text()
+
+    def handle_pi(self, data):
+        self._end_text()
+
+    def close(self):
+        super().close()
+        self._end_text()
+
+    def _record(self, term, cells):
+        if len(cells) < 6:
+            return None
+        code, title, letter_grade, credits, quality_points = cells[0], cells[1], cells[3], cells[4], cells[5]
+        # Filter: If credits and quality points don't parse to floats, discard the row
+        if not (_is_number(credits) and _is_number(quality_points)):
+            return None
+        if any(word in code.lower() for word in SKIP_ROW_WORDS):
+            return None
+        course = normalize_course_code(code)
+        if not course:
+            return None
+        match = TERM_PATTERN.match(term) if term else None
+        return {
+            "course": course,
+            "code": code,
+            "title": title,
+            "letter_grade": letter_grade,
+            "credits": float(credits),
+            "quality_points": float(quality_points),
+            "term": term,
+            "year": match.group(1) if match else None,
+            "semester": match.group(2) if match else None,
+        }
+
+
+def iter_transcript_records(source, chunk_size=CHUNK_SIZE):
+    """
+    Yields the course records of an HTML transcript (a file path or an open
+    text file) in document order, reading it once in chunks. Each record is a
+    dictionary with the normalized course code ("course"), the code as written
+    ("code"), "title", "letter_grade", "credits", "quality_points", the term
+    heading ("term") and its "year" and "semester" (None if the heading is not
+    a term like "2023 Fall").
+    """
+    if isinstance(source, str):
+        with open(source, "r", encoding="utf-8") as file:
+            yield from iter_transcript_records(file, chunk_size)
+        return
+    parser = TranscriptParser()
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        parser.feed(chunk)
+        yield from parser.records
+        parser.records.clear()
+    parser.close()
+    yield from parser.records
+    parser.records.clear()
@@ -1,15 +1,14 @@
+from smume.terms import Term
+
 def term_sort_key(term):
         """
-        Custom sort key for terms in the format 'YYYY-F', 'YYYY-S', etc.
-        Converts terms to a tuple of (year, season_order) for sorting.
+        Custom sort key for terms in the format 'YYYY-F', 'YYYY-S', etc. (or Term objects).
+        Converts terms to a tuple holding the term's integer ordinal for sorting.
         """
-        import re
-        match = re.match(r"(\d+)-([A-Za-z]+)", term)
-        if not match:
+        try:
+            return (int(Term.parse(term)),)
+        except ValueError:
             return (term,)
-        year, season = match.groups()
-        season_order = {'S': 0, 'Su': 1, 'Su1': 2, 'Su2': 3, 'F': 4}
-        return (int(year), season_order.get(season, 99))
 
 def normalize_categories(categories, valid_categories):
     if isinstance(categories, str):
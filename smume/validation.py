@@ -0,0 +1,103 @@
+# validation.py
+
+from collections import deque
+
+from smume.course_graph import RELATIONS
+from smume.scheduler import dependency_units
+
+
+class CurriculumValidationError(ValueError):
+    """
+    Raised when a curriculum has prerequisite cycles or references to unknown courses.
+    The ValidationReport is available as the `report` attribute.
+    """
+
+    def __init__(self, report):
+        super().__init__(str(report))
+        self.report = report
+
+
+class ValidationReport:
+    """
+    Result of validate_curriculum:
+        cycles:      lists of course names whose requirements form a cycle through
+                     at least one prerequisite (they can never all be satisfied)
+        dangling:    course name -> list of (relation, unknown course name)
+        unreachable: courses that depend (directly or transitively) on a cycle or
+                     an unknown course, and so can never have their requirements met
+    """
+
+    def __init__(self, name, cycles, dangling, unreachable):
+        self.name = name
+        self.cycles = cycles
+        self.dangling = dangling
+        self.unreachable = unreachable
+
+    @property
+    def ok(self):
+        return not self.cycles and not self.dangling
+
+    def errors(self):
+        """
+        Returns one message per problem.
+        """
+        messages = []
+        for members in self.cycles:
+            messages.append(f"Prerequisite cycle: {', '.join(members)}")
+        for course_name, references in self.dangling.items():
+            for rel, missing in references:
+                messages.append(f"{course_name} has unknown {rel} {missing}")
+        if self.unreachable:
+            messages.append(f"Blocked by the problems above: {', '.join(self.unreachable)}")
+        return messages
+
+    def __str__(self):
+        if self.ok:
+            return f"Curriculum {self.name}: no problems found."
+        return f"Curriculum {self.name} has problems:\n  - " + "\n  - ".join(self.errors())
+
+
+def validate_curriculum(curriculum):
+    """
+    Checks a curriculum's dependency graph once per curriculum version (the report
+    is cached on the compiled graph):
+        - prerequisite cycles: strongly connected dependency units (Tarjan) that
+          contain a prerequisite between two members, or a course that is its own
+          prerequisite,
+        - references to courses that are not in the curriculum,
+        - courses that can never be scheduled because of either problem.
+    Returns a ValidationReport.
+    """
+    graph = curriculum.graph
+    if "validation" in graph.cache:
+        return graph.cache["validation"]
+
+    units, unit_of = dependency_units(graph)
+    cycles = []
+    for position, members in enumerate(units):
+        if any(unit_of[j] == position for i in members for j in graph.reverse["prereq"][i]):
+            cycles.append([graph.names[i] for i in members])
+
+    # Everything downstream of a cycle or an unknown reference is blocked
+    blocked = [False] * len(graph)
+    queue = deque()
+    for members in cycles:
+        for name in members:
+            queue.append(graph.index[name])
+    for name in graph.dangling:
+        queue.append(graph.index[name])
+    sources = set(queue)
+    for i in queue:
+        blocked[i] = True
+    while queue:
+        i = queue.popleft()
+        for rel in RELATIONS:
+            for k in graph.forward[rel][i]:
+                if not blocked[k]:
+                    blocked[k] = True
+                    queue.append(k)
+    unreachable = [name for i, name in enumerate(graph.names) if blocked[i] and i not in sources]
+
+    report = ValidationReport(curriculum.name, cycles, dict(graph.dangling), unreachable)
+    graph.cache["validation"] = report
+    return report
@@ -16,9 +16,7 @@ plan.parse_html_transcript("test_student_transcript.html")
 plan.set_course_term("MTH 171", 2025, "Summer")
 plan.compress_schedule()  # Compress the schedule to remove gaps
 plan.bump_all_courses_to_typical_terms()
-plan.enforce_prerequisites()  # Enforce prerequisites and corequisites
-plan.enforce_coprerequisites()  # Enforce coprerequisites
-plan.enforce_corequisites()  # Enforce corequisites
+plan.enforce_dependencies()  # Enforce prerequisites, coprerequisites, and corequisites
 
 # Substitute a course
 # plan.substitute_course(old_name="COR 310", new_name="COR 320") # This is a valid substitution
@@ -0,0 +1,19 @@
+from smume.curriculum import Curriculum
+from smume.electives import assign_electives
+from smume.generic_plan import GenericPlan
+
+CATEGORIES = {"O": {"name": "Other", "order": 0, "aliases": []}}
+
+
+def test_unplanned_slots_are_not_filled():
+    curriculum = Curriculum("Test", CATEGORIES)
+    curriculum.course("E1", 3, categories=["O"], generic_for=["X", "Y"])
+    curriculum.course("E2", 3, categories=["O"], generic_for=["X", "Y"])
+    curriculum.course("X", 3, categories=["O"])
+    curriculum.course("Y", 3, categories=["O"])
+    plan = GenericPlan(curriculum)
+    # E1 was already replaced (no term); only E2 is still to be filled
+    plan.apply_term_mapping({"2025-F": ["E2", "X"]})
+    assignment = assign_electives(plan)
+    assert assignment["assigned"] == {"E2": "X"}
+    assert assignment["unfilled"] == []
@@ -0,0 +1,46 @@
+from smume.curriculum import Curriculum
+from smume.generic_plan import GenericPlan
+from smume.scheduler import critical_path, failure_impact
+from smume.terms import Term
+
+CATEGORIES = {"O": {"name": "Other", "order": 0, "aliases": []}}
+
+
+def make_plan():
+    curriculum = Curriculum("Test", CATEGORIES)
+    curriculum.course("A", 3, categories=["O"])
+    curriculum.course("C", 3, categories=["O"])
+    curriculum.course("B", 3, categories=["O"]).add_prereq("A").add_coreq("C")
+    curriculum.course("D", 3, categories=["O"]).add_prereq("C")
+    plan = GenericPlan(curriculum)
+    plan.apply_term_mapping({"2025-F": ["A"], "2026-S": ["B", "C"], "2026-F": ["D"]})
+    plan.term_now = Term.parse("2025-F")
+    return plan
+
+
+def test_failure_impact_moves_dependents_of_corequisite_partners():
+    plan = make_plan()
+    impact = failure_impact(plan, ["A"])
+    assert impact["retake"] == {"A": Term.parse("2026-S")}
+    new_terms = {name: new for name, (_, new, _) in impact["slipped"].items()}
+    assert new_terms["B"] == new_terms["C"] == Term.parse("2026-F")
+    # D has C as a prerequisite, so it must follow C even though it does not depend on A
+    assert new_terms["D"] > new_terms["C"]
+    assert impact["graduation_term"] == new_terms["D"]
+
+
+def test_critical_path_respects_typical_semesters():
+    curriculum = Curriculum("Test", CATEGORIES)
+    curriculum.course("A", 3, categories=["O"], typical_semester="F")
+    curriculum.course("B", 3, categories=["O"], typical_semester="F").add_prereq("A")
+    curriculum.course("C", 3, categories=["O"])
+    graph = curriculum.graph
+    typical = {graph.id(name): curriculum.courses[name].typical_semester for name in graph.names}
+    # Starting in spring, A waits for fall (index 1) and B for the next fall (index 3)
+    result = critical_path(graph, term_seasons=("S", "F"), typical=typical)
+    assert result["length"] == 4
+    assert [graph.names[i] for i in result["path"]] == ["A", "B"]
+    assert result["earliest"][graph.id("B")] == 3
+    assert result["slack"][graph.id("C")] == 3
+    # Without seasons the chain is two terms long
+    assert critical_path(graph)["length"] == 2
@@ -0,0 +1,26 @@
+import io
+
+from smume.transcript import iter_transcript_records
+
+TRANSCRIPT = """<html><body>
+<h2>2023   Fall</h2>
+<table>
+  <tr><td>Course</td><td>Title</td><td></td><td>Grade</td><td>Credits</td><td>Points</td></tr>
+  <tr><td> ME 101 </td><td>Intro to Design &amp; Drafting</td><td>-</td><td>A-</td><td>3.00</td><td>11.10</td></tr>
+  <tr><td>TERM TOTALS</td><td></td><td></td><td></td><td>3.00</td><td>11.10</td></tr>
+</table>
+<h2>2024 Spring</h2>
+<table>
+  <tr><td>mth171</td><td>Calculus <b>I</b></td><td>-</td><td>B</td><td>4.00</td><td>12.00</td></tr>
+</table>
+</body></html>"""
+
+
+def test_records_do_not_depend_on_chunk_size():
+    expected = list(iter_transcript_records(io.StringIO(TRANSCRIPT)))
+    assert [(r["course"], r["title"], r["term"], r["year"], r["semester"]) for r in expected] == [
+        ("ME 101", "Intro to Design & Drafting", "2023   Fall", "2023", "Fall"),
+        ("MTH 171", "CalculusI", "2024 Spring", "2024", "Spring"),
+    ]
+    for chunk_size in range(1, len(TRANSCRIPT) + 1):
+        assert list(iter_transcript_records(io.StringIO(TRANSCRIPT), chunk_size)) == expected, chunk_size